@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+
+router = APIRouter(tags=["Métricas"])
+
+
+@router.get("/metrics")
+async def metricas():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,77 @@
+from app.services.dataStore import cargar_epocas_commits
+import numpy as np
+import time
+
+# ANALÍTICA DE COMMITS CON NUMPY
+# Las fechas de los commits de cada repositorio (tabla commits del almacén
+# local) se cargan como un array de segundos desde epoch y las métricas se
+# calculan vectorizadas: medias por día y por hora con actividad, histogramas
+# por hora del día y por día de la semana, percentiles de commits por día y
+# ventanas móviles. Los arrays llegan ordenados desde el almacén, así que los
+# días y horas distintos se obtienen con diferencias en lugar de ordenar.
+# Se conservan en memoria entre ciclos y se descartan cuando la ingesta guarda
+# commits nuevos del repositorio.
+
+DIA = 86400
+PERCENTILES = (50, 90, 99)
+DIAS_SEMANA = [
+    "lunes",
+    "martes",
+    "miércoles",
+    "jueves",
+    "viernes",
+    "sábado",
+    "domingo",
+]
+
+_epocas = {}
+
+
+def epocas_repositorio(id_repositorio):
+    if id_repositorio not in _epocas:
+        _epocas[id_repositorio] = cargar_epocas_commits(id_repositorio)
+    return _epocas[id_repositorio]
+
+
+def invalidar_epocas(id_repositorio):
+    _epocas.pop(id_repositorio, None)
+
+
+def analizar_commits(epocas, ahora=None):
+    # epocas: segundos desde epoch en orden ascendente
+    ahora = int(time.time() if ahora is None else ahora)
+    if epocas.size == 0:
+        return {
+            "media_dia": 0,
+            "media_hora": None,
+            "histograma_horas": [0] * 24,
+            "histograma_semana": dict.fromkeys(DIAS_SEMANA, 0),
+            "percentiles_dia": {f"p{p}": 0 for p in PERCENTILES},
+            "max_dia": 0,
+            "max_ventana_7_dias": 0,
+            "ultimos_7_dias": 0,
+            "ultimos_30_dias": 0,
+        }
+    horas = epocas // 3600
+    dias = epocas // DIA
+    cortes = np.flatnonzero(np.diff(dias)) + 1
+    por_dia = np.diff(np.concatenate(([0], cortes, [epocas.size])))
+    # Serie diaria continua (con ceros) para las ventanas móviles de 7 días
+    acumulada = np.concatenate(([0], np.cumsum(np.bincount(dias - dias.min()))))
+    ventana = min(7, acumulada.size - 1)
+    # El 1 de enero de 1970 fue jueves: (dias + 3) % 7 == 0 es lunes
+    semana = np.bincount((dias + 3) % 7, minlength=7)
+    return {
+        "media_dia": float(epocas.size / por_dia.size),
+        "media_hora": float(epocas.size / (np.count_nonzero(np.diff(horas)) + 1)),
+        "histograma_horas": np.bincount(horas % 24, minlength=24).tolist(),
+        "histograma_semana": dict(zip(DIAS_SEMANA, semana.tolist())),
+        "percentiles_dia": {
+            f"p{p}": float(valor)
+            for p, valor in zip(PERCENTILES, np.percentile(por_dia, PERCENTILES))
+        },
+        "max_dia": int(por_dia.max()),
+        "max_ventana_7_dias": int((acumulada[ventana:] - acumulada[:-ventana]).max()),
+        "ultimos_7_dias": int(np.count_nonzero(epocas >= ahora - 7 * DIA)),
+        "ultimos_30_dias": int(np.count_nonzero(epocas >= ahora - 30 * DIA)),
+    }
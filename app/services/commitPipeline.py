@@ -0,0 +1,208 @@
+from config import config, data_repositorios, data_metricas_commits
+from app.services import githubClient
+from app.services.concurrency import mapear_concurrente, iterar_concurrente
+from app.services.registros import Commit, proyectar
+from app.services.commitAnalytics import (
+    analizar_commits,
+    epocas_repositorio,
+    invalidar_epocas,
+)
+from app.services.dataStore import (
+    cargar_estado_commits,
+    guardar_estado_commits,
+    guardar_commits,
+)
+import logging
+import asyncio
+
+# INGESTA ÚNICA DE COMMITS
+# Recorre una sola vez el historial de la rama por defecto de cada repositorio
+# y alimenta con cada commit a todos los agregadores (total y por autor). Las
+# métricas temporales (por día, por hora, histogramas, percentiles...) se
+# calculan con commitAnalytics sobre las fechas guardadas en la tabla commits,
+# en lugar de descargar el historial una vez por métrica.
+#
+# SINCRONIZACIÓN INCREMENTAL
+# Por cada repositorio/rama se guarda en el almacén local una marca de agua
+# (sha y fecha del último commit visto) junto con el estado de los agregadores.
+# En el siguiente ciclo sólo se piden los commits con since=<fecha> y se suman
+# al estado guardado. Los commits nuevos se guardan también en la tabla commits.
+
+
+class AgregadorTotal:
+    def __init__(self, estado=None):
+        self.total = estado or 0
+
+    def agregar(self, commit):
+        self.total += 1
+
+    def estado(self):
+        return self.total
+
+    def resultado(self):
+        return self.total
+
+
+class AgregadorPorAutor:
+    def __init__(self, estado=None):
+        self.autores = dict(estado or {})
+
+    def agregar(self, commit):
+        if commit.login:
+            self.autores[commit.login] = self.autores.get(commit.login, 0) + 1
+
+    def estado(self):
+        return self.autores
+
+    def resultado(self):
+        return self.autores
+
+
+AGREGADORES = {
+    "total": AgregadorTotal,
+    "por_autor": AgregadorPorAutor,
+}
+
+_lock_ingesta = asyncio.Lock()
+# Referencias a las ingestas en segundo plano para que no se recojan a medias
+_tareas_ingesta = set()
+
+
+def crear_agregadores(estado_previo):
+    agregados = estado_previo.get("agregados", {})
+    return {
+        nombre: clase(agregados.get(nombre)) for nombre, clase in AGREGADORES.items()
+    }
+
+
+def resumir_agregadores(marca, agregadores):
+    return {
+        "marca": marca,
+        "agregados": {
+            nombre: agregador.estado() for nombre, agregador in agregadores.items()
+        },
+        "metricas": {
+            nombre: agregador.resultado() for nombre, agregador in agregadores.items()
+        },
+    }
+
+
+async def ingerir_commits_repositorio(repo, estado_previo=None):
+    nombre_repo = repo["Repositorio"]
+    rama_por_defecto = repo["rama por defecto"]
+    estado_previo = estado_previo or {}
+    marca = estado_previo.get("marca")
+    agregadores = crear_agregadores(estado_previo)
+    headers = {
+        "Authorization": f"token {config['TOKEN']}",
+        "Accept": "application/vnd.github+json",
+    }
+    nueva_marca = marca
+    page = 1
+    while rama_por_defecto:
+        url_commits = f"{config['GITHUB_API_URL']}/repos/{config['ORG']}/{nombre_repo}/commits?sha={rama_por_defecto}&per_page=100&page={page}"
+        if marca:
+            url_commits += f"&since={marca['fecha']}"
+        try:
+            response = await githubClient.get(url_commits, headers=headers)
+        except githubClient.RequestException as e:
+            logging.error(f"Error en la solicitud para URL {url_commits}: {e}")
+            return None
+        if response.status_code == 409 and page == 1:
+            logging.warning(
+                f"Repositorio '{nombre_repo}' en la rama '{rama_por_defecto}' sin commits."
+            )
+            break
+        if response.status_code != 200:
+            # Sin marca nueva: el siguiente ciclo repite desde la anterior
+            logging.warning(
+                f"Repositorio '{nombre_repo}' en la rama '{rama_por_defecto}' inaccesible en la página {page}. Código: {response.status_code}"
+            )
+            return None
+        commits = proyectar(Commit, response.json())
+        if not commits:
+            break
+        if page == 1:
+            nueva_marca = {"sha": commits[0].sha, "fecha": commits[0].fecha}
+        vista_marca = False
+        nuevos = []
+        for commit in commits:
+            if marca and commit.sha == marca["sha"]:
+                vista_marca = True
+                break
+            nuevos.append(commit)
+            for agregador in agregadores.values():
+                agregador.agregar(commit)
+        guardar_commits(repo["id_repositorio"], nuevos)
+        if nuevos:
+            invalidar_epocas(repo["id_repositorio"])
+        if vista_marca:
+            break
+        page += 1
+    return resumir_agregadores(nueva_marca, agregadores)
+
+
+async def ingerir(repo):
+    clave = f"{repo['id_repositorio']}:{repo['rama por defecto']}"
+    estado_previo = cargar_estado_commits(clave)
+    resultado = await ingerir_commits_repositorio(repo, estado_previo)
+    if resultado is None:
+        # Error a mitad de la paginación: se conserva el estado anterior
+        resultado = resumir_agregadores(
+            estado_previo.get("marca"), crear_agregadores(estado_previo)
+        )
+    else:
+        guardar_estado_commits(
+            clave,
+            {
+                "marca": resultado["marca"],
+                "agregados": resultado["agregados"],
+            },
+        )
+    metricas = dict(resultado["metricas"])
+    metricas.update(analizar_commits(epocas_repositorio(repo["id_repositorio"])))
+    return metricas
+
+
+async def obtener_metricas_commits():
+    async with _lock_ingesta:
+        if not data_metricas_commits:
+            resultados = await mapear_concurrente(ingerir, data_repositorios)
+            for repo, metricas in zip(data_repositorios, resultados):
+                data_metricas_commits[repo["id_repositorio"]] = metricas
+    return data_metricas_commits
+
+
+async def _producir_metricas_commits(cola):
+    try:
+        async with _lock_ingesta:
+            if data_metricas_commits:
+                for repo in data_repositorios:
+                    metricas = data_metricas_commits.get(repo["id_repositorio"])
+                    if metricas is not None:
+                        cola.put_nowait((repo, metricas))
+                return
+            completas = {}
+            async for repo, metricas in iterar_concurrente(ingerir, data_repositorios):
+                completas[repo["id_repositorio"]] = metricas
+                cola.put_nowait((repo, metricas))
+            data_metricas_commits.update(completas)
+    finally:
+        cola.put_nowait(None)
+
+
+async def iterar_metricas_commits():
+    # Entrega (repo, métricas) a medida que termina la ingesta de cada
+    # repositorio. La ingesta corre en una tarea aparte que llena una cola:
+    # el lock no se retiene mientras el cliente lee, y si el cliente se
+    # desconecta la ingesta sigue hasta rellenar data_metricas_commits.
+    cola = asyncio.Queue()
+    tarea = asyncio.ensure_future(_producir_metricas_commits(cola))
+    _tareas_ingesta.add(tarea)
+    tarea.add_done_callback(_tareas_ingesta.discard)
+    while True:
+        elemento = await cola.get()
+        if elemento is None:
+            break
+        yield elemento
+    await tarea
@@ -0,0 +1,36 @@
+from config import config
+import asyncio
+
+# MOTOR DE CONCURRENCIA
+# Reparte el trabajo por repositorio (o por usuario, rama...) entre varias
+# tareas simultáneas, con un máximo configurable de tareas en vuelo.
+# Los resultados se devuelven en el mismo orden que los elementos de entrada,
+# o a medida que terminan con iterar_concurrente.
+
+
+async def mapear_concurrente(funcion, elementos, limite=None):
+    semaforo = asyncio.Semaphore(limite or config["MAX_TAREAS_CONCURRENTES"])
+
+    async def ejecutar(elemento):
+        async with semaforo:
+            return await funcion(elemento)
+
+    return await asyncio.gather(*(ejecutar(elemento) for elemento in elementos))
+
+
+async def iterar_concurrente(funcion, elementos, limite=None):
+    # Igual que mapear_concurrente pero entrega (elemento, resultado) según
+    # van terminando, para poder emitir cada resultado sin esperar al resto.
+    semaforo = asyncio.Semaphore(limite or config["MAX_TAREAS_CONCURRENTES"])
+
+    async def ejecutar(elemento):
+        async with semaforo:
+            return elemento, await funcion(elemento)
+
+    tareas = [asyncio.ensure_future(ejecutar(elemento)) for elemento in elementos]
+    try:
+        for siguiente in asyncio.as_completed(tareas):
+            yield await siguiente
+    finally:
+        for tarea in tareas:
+            tarea.cancel()
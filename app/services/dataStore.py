@@ -0,0 +1,242 @@
+from config import (
+    config,
+    data_repositorios,
+    data_lenguajes,
+    data_usuarios,
+    data_usuarios_activos,
+)
+from app.services.repoCatalog import actualizar_catalogo
+import numpy as np
+import logging
+import sqlite3
+import json
+import os
+
+# ALMACÉN LOCAL EN SQLITE
+# Guarda en disco los datos crudos de GitHub (repositorios, lenguajes,
+# usuarios, usuarios activos y commits), el estado incremental de la ingesta
+# de commits y de los tiempos de resolución de issues y pulls, la caché de
+# versiones de los registros de paquetes y el último resultado materializado
+# de cada endpoint. Al arrancar se recargan las listas de config, de modo que
+# un reinicio no empieza en frío, y cada ciclo guarda una instantánea nueva.
+#
+# Las listas de config (un registro por repositorio o usuario) siguen
+# completas en memoria; sólo el historial de commits, que es lo que crece,
+# vive únicamente en la tabla commits.
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS repositorios (
+    id_repositorio INTEGER PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lenguajes (
+    id_repositorio INTEGER PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usuarios (
+    login TEXT PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usuarios_activos (
+    login TEXT PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commits (
+    id_repositorio INTEGER NOT NULL,
+    sha TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    login TEXT,
+    PRIMARY KEY (id_repositorio, sha)
+);
+CREATE INDEX IF NOT EXISTS idx_commits_fecha ON commits (id_repositorio, fecha);
+CREATE INDEX IF NOT EXISTS idx_commits_login ON commits (login);
+CREATE TABLE IF NOT EXISTS commits_estado (
+    clave TEXT PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versiones_registro (
+    ecosistema TEXT NOT NULL,
+    paquete TEXT NOT NULL,
+    version TEXT NOT NULL,
+    expira REAL NOT NULL,
+    PRIMARY KEY (ecosistema, paquete)
+);
+CREATE TABLE IF NOT EXISTS resoluciones_estado (
+    clave TEXT PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resultados (
+    clave TEXT PRIMARY KEY,
+    datos TEXT NOT NULL,
+    actualizado REAL NOT NULL
+);
+"""
+
+# tabla -> (lista en memoria, campo del registro, columna clave)
+TABLAS = {
+    "repositorios": (data_repositorios, "id_repositorio", "id_repositorio"),
+    "lenguajes": (data_lenguajes, "id_repositorio", "id_repositorio"),
+    "usuarios": (data_usuarios, "usuario", "login"),
+    "usuarios_activos": (data_usuarios_activos, "login", "login"),
+}
+
+_conexion = None
+
+
+def obtener_conexion():
+    global _conexion
+    if _conexion is None:
+        directorio = os.path.dirname(config["DB_ARCHIVO"])
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        _conexion = sqlite3.connect(config["DB_ARCHIVO"], check_same_thread=False)
+        _conexion.execute("PRAGMA journal_mode=WAL")
+        _conexion.execute("PRAGMA synchronous=NORMAL")
+        _conexion.executescript(ESQUEMA)
+    return _conexion
+
+
+def cerrar_conexion():
+    global _conexion
+    if _conexion is not None:
+        _conexion.close()
+    _conexion = None
+
+
+def guardar_registros(tabla, registros):
+    _, campo, columna = TABLAS[tabla]
+    conexion = obtener_conexion()
+    with conexion:
+        conexion.execute(f"DELETE FROM {tabla}")
+        conexion.executemany(
+            f"INSERT OR REPLACE INTO {tabla} ({columna}, datos) VALUES (?, ?)",
+            [(registro[campo], json.dumps(registro)) for registro in registros],
+        )
+
+
+def cargar_registros(tabla):
+    filas = obtener_conexion().execute(f"SELECT datos FROM {tabla} ORDER BY rowid")
+    return [json.loads(datos) for (datos,) in filas]
+
+
+def guardar_datos():
+    for tabla, (lista, _, _) in TABLAS.items():
+        # Un ciclo fallido no debe borrar la última instantánea buena
+        if lista:
+            guardar_registros(tabla, lista)
+
+
+def cargar_datos():
+    for tabla, (lista, _, _) in TABLAS.items():
+        try:
+            lista[:] = cargar_registros(tabla)
+        except sqlite3.Error as e:
+            logging.error(f"No se pudo cargar la tabla {tabla}: {e}")
+    actualizar_catalogo()
+    logging.info(
+        f"Datos cargados del almacén local: {len(data_repositorios)} repositorios, {len(data_usuarios)} usuarios"
+    )
+
+
+def guardar_commits(id_repositorio, commits):
+    conexion = obtener_conexion()
+    with conexion:
+        conexion.executemany(
+            "INSERT OR IGNORE INTO commits (id_repositorio, sha, fecha, login) VALUES (?, ?, ?, ?)",
+            [
+                (id_repositorio, commit.sha, commit.fecha, commit.login)
+                for commit in commits
+            ],
+        )
+
+
+def cargar_epocas_commits(id_repositorio):
+    filas = (
+        obtener_conexion()
+        .execute(
+            "SELECT CAST(strftime('%s', fecha) AS INTEGER) FROM commits WHERE id_repositorio = ? ORDER BY fecha",
+            (id_repositorio,),
+        )
+        .fetchall()
+    )
+    return np.array(filas, dtype=np.int64).reshape(-1)
+
+
+def cargar_estado_commits(clave):
+    fila = (
+        obtener_conexion()
+        .execute("SELECT datos FROM commits_estado WHERE clave = ?", (clave,))
+        .fetchone()
+    )
+    return json.loads(fila[0]) if fila else {}
+
+
+def guardar_estado_commits(clave, estado):
+    conexion = obtener_conexion()
+    with conexion:
+        conexion.execute(
+            "INSERT OR REPLACE INTO commits_estado (clave, datos) VALUES (?, ?)",
+            (clave, json.dumps(estado)),
+        )
+
+
+def cargar_estado_resoluciones(clave):
+    fila = (
+        obtener_conexion()
+        .execute("SELECT datos FROM resoluciones_estado WHERE clave = ?", (clave,))
+        .fetchone()
+    )
+    return json.loads(fila[0]) if fila else {}
+
+
+def guardar_estado_resoluciones(clave, estado):
+    conexion = obtener_conexion()
+    with conexion:
+        conexion.execute(
+            "INSERT OR REPLACE INTO resoluciones_estado (clave, datos) VALUES (?, ?)",
+            (clave, json.dumps(estado)),
+        )
+
+
+def cargar_version_registro(ecosistema, paquete):
+    return (
+        obtener_conexion()
+        .execute(
+            "SELECT version, expira FROM versiones_registro WHERE ecosistema = ? AND paquete = ?",
+            (ecosistema, paquete),
+        )
+        .fetchone()
+    )
+
+
+def guardar_version_registro(ecosistema, paquete, version, expira):
+    conexion = obtener_conexion()
+    with conexion:
+        conexion.execute(
+            "INSERT OR REPLACE INTO versiones_registro (ecosistema, paquete, version, expira) VALUES (?, ?, ?, ?)",
+            (ecosistema, paquete, version, expira),
+        )
+
+
+def listar_versiones_registro():
+    return obtener_conexion().execute(
+        "SELECT ecosistema, paquete, version FROM versiones_registro ORDER BY ecosistema, paquete"
+    )
+
+
+def cargar_resultado(clave):
+    fila = (
+        obtener_conexion()
+        .execute("SELECT datos, actualizado FROM resultados WHERE clave = ?", (clave,))
+        .fetchone()
+    )
+    return {"datos": json.loads(fila[0]), "actualizado": fila[1]} if fila else None
+
+
+def guardar_resultado(clave, datos, actualizado):
+    conexion = obtener_conexion()
+    with conexion:
+        conexion.execute(
+            "INSERT OR REPLACE INTO resultados (clave, datos, actualizado) VALUES (?, ?, ?)",
+            (clave, json.dumps(datos, default=str), actualizado),
+        )
@@ -0,0 +1,37 @@
+from datetime import datetime
+from functools import lru_cache
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# DECODIFICACIÓN DE RESPUESTAS
+# Las respuestas de GitHub se decodifican con orjson si está instalado (con
+# json de la biblioteca estándar como alternativa) y las fechas, que siempre
+# llegan como 2024-01-31T12:34:56Z, se leen por posición en lugar de con
+# strptime. Las fechas repetidas (creación de repos, último commit de cada
+# rama...) se resuelven desde una caché.
+
+FORMATO_FECHA = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def decodificar_json(contenido):
+    if orjson is not None:
+        return orjson.loads(contenido)
+    return json.loads(contenido)
+
+
+@lru_cache(maxsize=4096)
+def parsear_fecha(texto):
+    if len(texto) != 20 or texto[10] != "T" or texto[19] != "Z":
+        return datetime.strptime(texto, FORMATO_FECHA)
+    return datetime(
+        int(texto[0:4]),
+        int(texto[5:7]),
+        int(texto[8:10]),
+        int(texto[11:13]),
+        int(texto[14:16]),
+        int(texto[17:19]),
+    )
@@ -0,0 +1,29 @@
+from elasticsearch import AsyncElasticsearch
+from config import config
+
+# CLIENTE ELASTICSEARCH COMPARTIDO
+# Se crea en el primer uso, al indexar, y se cierra en el apagado; la
+# aplicación arranca aunque falte ELASTIC_SEARCH_URL. Todos los indexadores
+# comparten el mismo pool de conexiones.
+
+_es = None
+
+
+def obtener_es():
+    global _es
+    if _es is None:
+        _es = AsyncElasticsearch(
+            [config["ELASTIC_SEARCH_URL"]],
+            basic_auth=(
+                (config["ELASTICSEARCH_USERNAME"] or "").strip(),
+                (config["ELASTIC_PASSWORD"] or "").strip(),
+            ),
+        )
+    return _es
+
+
+async def cerrar_es():
+    global _es
+    if _es is not None:
+        await _es.close()
+    _es = None
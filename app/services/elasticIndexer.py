@@ -0,0 +1,97 @@
+from elasticsearch import helpers
+from config import config
+from app.services.elasticClient import obtener_es
+from app.services import metrics
+import logging
+import json
+import time
+
+# INDEXACIÓN MASIVA EN ELASTICSEARCH
+# Agrupa los documentos en peticiones _bulk con actualizaciones parciales
+# (doc_as_upsert), en lugar de hacer un get + update/index por documento.
+# El lote se envía al alcanzar ES_BULK_TAMANO documentos, ES_BULK_BYTES bytes
+# o ES_BULK_INTERVALO segundos desde el último envío.
+
+
+class IndexadorBulk:
+    def __init__(self, index_name, tamano=None, max_bytes=None, intervalo=None):
+        self.index_name = index_name
+        self.tamano = tamano or config["ES_BULK_TAMANO"]
+        self.max_bytes = max_bytes or config["ES_BULK_BYTES"]
+        self.intervalo = intervalo or config["ES_BULK_INTERVALO"]
+        self.acciones = []
+        self.bytes = 0
+        self.ultimo_envio = time.monotonic()
+        self.indexados = 0
+        self.errores = []
+
+    async def agregar(self, doc_id, documento):
+        self.acciones.append(
+            {
+                "_op_type": "update",
+                "_index": self.index_name,
+                "_id": doc_id,
+                "doc": documento,
+                "doc_as_upsert": True,
+            }
+        )
+        self.bytes += len(json.dumps(documento, default=str))
+        if (
+            len(self.acciones) >= self.tamano
+            or self.bytes >= self.max_bytes
+            or time.monotonic() - self.ultimo_envio >= self.intervalo
+        ):
+            await self.enviar()
+
+    async def enviar(self):
+        acciones, self.acciones, self.bytes = self.acciones, [], 0
+        self.ultimo_envio = time.monotonic()
+        if not acciones:
+            return
+        inicio = time.monotonic()
+        indexados, errores = self.indexados, len(self.errores)
+        try:
+            async for ok, item in helpers.async_streaming_bulk(
+                obtener_es(),
+                acciones,
+                chunk_size=self.tamano,
+                max_chunk_bytes=self.max_bytes,
+                raise_on_error=False,
+                raise_on_exception=False,
+            ):
+                if ok:
+                    self.indexados += 1
+                    continue
+                detalle = item.get("update", item)
+                self.errores.append(detalle)
+                logging.error(
+                    f"Error al indexar documento {detalle.get('_id')} en Elasticsearch: {detalle.get('error')}"
+                )
+        except Exception as e:
+            self.errores.extend(
+                {"_id": accion["_id"], "error": str(e)} for accion in acciones
+            )
+            logging.error(f"Error al indexar lote en Elasticsearch: {e}")
+        metrics.LATENCIA_BULK.labels(self.index_name).observe(time.monotonic() - inicio)
+        metrics.DOCUMENTOS_INDEXADOS.labels(self.index_name).inc(
+            self.indexados - indexados
+        )
+        metrics.ERRORES_INDEXACION.labels(self.index_name).inc(
+            len(self.errores) - errores
+        )
+
+    async def cerrar(self):
+        await self.enviar()
+        return {"indexados": self.indexados, "errores": self.errores}
+
+
+async def indexar_documentos(documentos, index_name, id_documento):
+    indexador = IndexadorBulk(index_name)
+    for documento in documentos:
+        metrics.DOCUMENTOS_PRODUCIDOS.labels(index_name).inc()
+        await indexador.agregar(id_documento(documento), documento)
+    resumen = await indexador.cerrar()
+    logging.info(
+        f"Indexados {resumen['indexados']} documentos en {index_name}, errores: {len(resumen['errores'])}"
+    )
+    return resumen
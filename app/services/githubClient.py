@@ -0,0 +1,210 @@
+from config import config
+from app.services import rateLimiter, metrics
+from app.services.decodificacion import decodificar_json
+from collections import OrderedDict
+from yarl import URL
+import aiohttp
+import asyncio
+import logging
+import time
+
+# CLIENTE HTTP COMPARTIDO
+# Una única sesión aiohttp con conexiones persistentes (keep-alive) para todas
+# las consultas a GitHub y a los registros de paquetes.
+#
+# Las respuestas GET con ETag o Last-Modified se guardan en una caché LRU y se
+# revalidan con If-None-Match / If-Modified-Since. GitHub no descuenta las
+# respuestas 304 del límite de consultas. Sólo se guardan las de la API de
+# GitHub, salvo los listados de commits y las consultas con since=, que cambian
+# en cada ciclo; la caché se limita por número de entradas y por bytes.
+
+_sesion = None
+_semaforos_host = {}
+_cache_respuestas = OrderedDict()
+_bytes_cache = 0
+
+
+class RequestException(Exception):
+    pass
+
+
+class HTTPError(RequestException):
+    def __init__(self, response):
+        super().__init__(
+            f"Error HTTP {response.status_code} para URL {response.url}: {response.text}"
+        )
+        self.response = response
+
+
+class Respuesta:
+    def __init__(self, url, status_code, headers, contenido, links):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.contenido = contenido
+        self.links = links
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.contenido.decode("utf-8", errors="replace")
+
+    def json(self):
+        return decodificar_json(self.contenido)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HTTPError(self)
+
+
+def obtener_sesion():
+    global _sesion
+    if _sesion is None or _sesion.closed:
+        connector = aiohttp.TCPConnector(
+            limit=config["HTTP_MAX_CONEXIONES"],
+            keepalive_timeout=config["HTTP_KEEPALIVE"],
+            ttl_dns_cache=300,
+        )
+        _sesion = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=config["HTTP_TIMEOUT"]),
+        )
+    return _sesion
+
+
+async def cerrar_sesion():
+    global _sesion
+    if _sesion is not None and not _sesion.closed:
+        await _sesion.close()
+    _sesion = None
+
+
+def _semaforo_host(url):
+    host = URL(url).host
+    if host not in _semaforos_host:
+        _semaforos_host[host] = asyncio.Semaphore(config["HTTP_MAX_POR_HOST"])
+    return _semaforos_host[host]
+
+
+async def _enviar(metodo, url, headers=None, **kwargs):
+    sesion = obtener_sesion()
+    endpoint = metrics.plantilla_endpoint(url)
+    async with _semaforo_host(url):
+        inicio = time.monotonic()
+        # Si la tarea se cancela a mitad de la petición no llega a otro estado
+        estado = "cancelado"
+        try:
+            async with sesion.request(metodo, url, headers=headers, **kwargs) as resp:
+                contenido = await resp.read()
+                links = {
+                    rel: {"url": str(link["url"])} for rel, link in resp.links.items()
+                }
+                estado = str(resp.status)
+                return Respuesta(
+                    str(resp.url), resp.status, resp.headers, contenido, links
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            estado = "error"
+            logging.error(f"Error de conexión para URL {url}: {e}")
+            raise RequestException(f"Error de conexión para URL {url}: {e}") from e
+        finally:
+            metrics.PETICIONES_HTTP.labels(metodo, endpoint, estado).inc()
+            metrics.LATENCIA_HTTP.labels(metodo, endpoint).observe(
+                time.monotonic() - inicio
+            )
+
+
+async def _peticion(metodo, url, headers=None, **kwargs):
+    if not rateLimiter.es_url_github(url):
+        return await _enviar(metodo, url, headers=headers, **kwargs)
+    cubeta = rateLimiter.obtener_cubeta(rateLimiter.recurso_url(url))
+    intento = 0
+    while True:
+        await cubeta.adquirir()
+        response = await _enviar(metodo, url, headers=headers, **kwargs)
+        espera = cubeta.actualizar(response.headers, response.status_code)
+        if cubeta.restantes is not None:
+            metrics.LIMITE_RESTANTE.labels(cubeta.recurso).set(cubeta.restantes)
+        if espera is None or intento >= config["RATE_LIMIT_REINTENTOS"]:
+            return response
+        intento += 1
+        logging.warning(
+            f"{response.status_code}: límite de GitHub alcanzado para URL {url}, reintento {intento} en {round(espera)} s"
+        )
+        await asyncio.sleep(espera)
+
+
+def _clave_cache(url, headers, params):
+    return (
+        url,
+        tuple(sorted((params or {}).items())),
+        (headers or {}).get("Accept"),
+    )
+
+
+def _cacheable(url, params):
+    if not rateLimiter.es_url_github(url):
+        return False
+    url = URL(url)
+    if url.path.endswith("/commits"):
+        return False
+    return "since" not in url.query and "since" not in (params or {})
+
+
+def _guardar_en_cache(clave, response):
+    global _bytes_cache
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+    if len(response.contenido) > config["HTTP_CACHE_BYTES"]:
+        return
+    anterior = _cache_respuestas.pop(clave, None)
+    if anterior:
+        _bytes_cache -= len(anterior["contenido"])
+    _bytes_cache += len(response.contenido)
+    _cache_respuestas[clave] = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "contenido": response.contenido,
+        "links": response.links,
+    }
+    while (
+        len(_cache_respuestas) > config["HTTP_CACHE_MAX"]
+        or _bytes_cache > config["HTTP_CACHE_BYTES"]
+    ):
+        _, descartada = _cache_respuestas.popitem(last=False)
+        _bytes_cache -= len(descartada["contenido"])
+
+
+async def get(url, headers=None, params=None):
+    if config["HTTP_CACHE_MAX"] <= 0 or not _cacheable(url, params):
+        return await _peticion("GET", url, headers=headers, params=params)
+    clave = _clave_cache(url, headers, params)
+    cacheada = _cache_respuestas.get(clave)
+    if cacheada:
+        headers = dict(headers or {})
+        if cacheada["etag"]:
+            headers["If-None-Match"] = cacheada["etag"]
+        if cacheada["last_modified"]:
+            headers["If-Modified-Since"] = cacheada["last_modified"]
+    response = await _peticion("GET", url, headers=headers, params=params)
+    if response.status_code == 304 and cacheada:
+        _cache_respuestas.move_to_end(clave)
+        return Respuesta(
+            response.url,
+            200,
+            response.headers,
+            cacheada["contenido"],
+            cacheada["links"],
+        )
+    if response.status_code == 200:
+        _guardar_en_cache(clave, response)
+    return response
+
+
+async def post(url, json=None, headers=None):
+    return await _peticion("POST", url, headers=headers, json=json)
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+from config import config, data_repositorios, data_ramas, data_conteos
+from app.services import githubClient
+from app.services.concurrency import mapear_concurrente
+from app.services.decodificacion import parsear_fecha
+import logging
+import asyncio
+
+# CONSULTAS GRAPHQL POR LOTES
+# Una sola consulta con sub-consultas con alias (r0, r1, ...) devuelve, para
+# varios repositorios a la vez, todas sus ramas con el total de commits del
+# historial, los commits de la última semana y la fecha del último commit.
+# Sustituye las llamadas REST/GraphQL por repositorio y por rama.
+# Del mismo modo se piden los totales de issues y pull requests abiertos y
+# cerrados (totalCount) sin listar cada elemento.
+
+CAMPOS_RAMAS = """
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        target {
+          ... on Commit {
+            authoredDate
+            history { totalCount }
+            semana: history(since: $desde) { totalCount }
+          }
+        }
+      }
+"""
+
+CAMPOS_CONTEOS = """
+    issuesAbiertas: issues(states: OPEN) { totalCount }
+    issuesCerradas: issues(states: CLOSED) { totalCount }
+    pullsAbiertos: pullRequests(states: OPEN) { totalCount }
+    pullsCerrados: pullRequests(states: [CLOSED, MERGED]) { totalCount }
+"""
+
+_lock_ramas = asyncio.Lock()
+_lock_conteos = asyncio.Lock()
+
+
+def construir_consulta_ramas(lote):
+    parametros = ["$owner: String!", "$desde: GitTimestamp!"]
+    subconsultas = []
+    variables = {}
+    for i, (nombre_repo, cursor) in enumerate(lote):
+        parametros.append(f"$n{i}: String!")
+        parametros.append(f"$c{i}: String")
+        variables[f"n{i}"] = nombre_repo
+        variables[f"c{i}"] = cursor
+        subconsultas.append(
+            f"""
+  r{i}: repository(owner: $owner, name: $n{i}) {{
+    refs(refPrefix: "refs/heads/", first: 100, after: $c{i}) {{{CAMPOS_RAMAS}    }}
+  }}"""
+        )
+    consulta = f"query({', '.join(parametros)}) {{{''.join(subconsultas)}\n}}"
+    return consulta, variables
+
+
+async def ejecutar_consulta(consulta, variables):
+    headers = {"Authorization": f"Bearer {config['TOKEN']}"}
+    response = await githubClient.post(
+        f"{config['GITHUB_API_URL']}/graphql",
+        json={"query": consulta, "variables": variables},
+        headers=headers,
+    )
+    response.raise_for_status()
+    data = response.json()
+    for error in data.get("errors") or []:
+        logging.warning(f"Error GraphQL: {error.get('message')}")
+    return data.get("data") or {}
+
+
+async def consultar_ramas_lote(lote, desde):
+    consulta, variables = construir_consulta_ramas(lote)
+    variables["owner"] = config["ORG"]
+    variables["desde"] = desde
+    try:
+        data = await ejecutar_consulta(consulta, variables)
+    except githubClient.RequestException as e:
+        logging.error(f"Error al consultar ramas por GraphQL: {e}")
+        return [(nombre_repo, [], None) for nombre_repo, _ in lote]
+    resultado = []
+    for i, (nombre_repo, _) in enumerate(lote):
+        repositorio = data.get(f"r{i}")
+        if not repositorio or not repositorio.get("refs"):
+            resultado.append((nombre_repo, [], None))
+            continue
+        refs = repositorio["refs"]
+        siguiente = (
+            refs["pageInfo"]["endCursor"] if refs["pageInfo"]["hasNextPage"] else None
+        )
+        resultado.append((nombre_repo, refs["nodes"], siguiente))
+    return resultado
+
+
+def leer_rama(nodo):
+    target = nodo.get("target") or {}
+    if "history" not in target:
+        return {"total": 0, "semana": 0, "fecha": None}
+    return {
+        "total": target["history"]["totalCount"],
+        "semana": target["semana"]["totalCount"],
+        "fecha": parsear_fecha(target["authoredDate"]),
+    }
+
+
+async def consultar_ramas_repositorios(nombres_repos):
+    desde = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    ramas = {nombre_repo: {} for nombre_repo in nombres_repos}
+    pendientes = [(nombre_repo, None) for nombre_repo in nombres_repos]
+    tamano = config["GRAPHQL_LOTE"]
+    while pendientes:
+        lotes = [pendientes[i : i + tamano] for i in range(0, len(pendientes), tamano)]
+        pendientes = []
+        for resultado in await mapear_concurrente(
+            lambda lote: consultar_ramas_lote(lote, desde), lotes
+        ):
+            for nombre_repo, nodos, siguiente in resultado:
+                for nodo in nodos:
+                    ramas[nombre_repo][nodo["name"]] = leer_rama(nodo)
+                if siguiente:
+                    pendientes.append((nombre_repo, siguiente))
+    return ramas
+
+
+async def obtener_ramas_repositorios():
+    async with _lock_ramas:
+        if not data_ramas:
+            data_ramas.update(
+                await consultar_ramas_repositorios(
+                    [repo["Repositorio"] for repo in data_repositorios]
+                )
+            )
+    return data_ramas
+
+
+def construir_consulta_conteos(nombres_repos):
+    parametros = ["$owner: String!"]
+    subconsultas = []
+    variables = {}
+    for i, nombre_repo in enumerate(nombres_repos):
+        parametros.append(f"$q{i}: String!")
+        variables[f"q{i}"] = nombre_repo
+        subconsultas.append(
+            f"""
+  r{i}: repository(owner: $owner, name: $q{i}) {{{CAMPOS_CONTEOS}  }}"""
+        )
+    consulta = f"query({', '.join(parametros)}) {{{''.join(subconsultas)}\n}}"
+    return consulta, variables
+
+
+async def consultar_conteos_lote(lote):
+    consulta, variables = construir_consulta_conteos(lote)
+    variables["owner"] = config["ORG"]
+    try:
+        data = await ejecutar_consulta(consulta, variables)
+    except githubClient.RequestException as e:
+        logging.error(f"Error al consultar totales de issues y pulls por GraphQL: {e}")
+        return {}
+    conteos = {}
+    for i, nombre_repo in enumerate(lote):
+        repositorio = data.get(f"r{i}")
+        if repositorio:
+            conteos[nombre_repo] = {
+                "issues_abiertas": repositorio["issuesAbiertas"]["totalCount"],
+                "issues_cerradas": repositorio["issuesCerradas"]["totalCount"],
+                "pulls_abiertos": repositorio["pullsAbiertos"]["totalCount"],
+                "pulls_cerrados": repositorio["pullsCerrados"]["totalCount"],
+            }
+    return conteos
+
+
+async def obtener_conteos_repositorios():
+    async with _lock_conteos:
+        if not data_conteos:
+            nombres = [repo["Repositorio"] for repo in data_repositorios]
+            # Los repositorios de un lote fallido quedan en None: no se
+            # reintentan en este ciclo y sus métricas usan el listado completo
+            data_conteos.update(dict.fromkeys(nombres))
+            tamano = config["GRAPHQL_LOTE"]
+            lotes = [nombres[i : i + tamano] for i in range(0, len(nombres), tamano)]
+            for conteos in await mapear_concurrente(consultar_conteos_lote, lotes):
+                data_conteos.update(conteos)
+    return data_conteos
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from config import config
+from app.services import githubClient
+from app.services.graphqlBatch import obtener_conteos_repositorios
+from app.services.decodificacion import parsear_fecha
+from app.services.dataStore import (
+    cargar_estado_resoluciones,
+    guardar_estado_resoluciones,
+)
+import logging
+
+# MÉTRICAS AGREGADAS DE ISSUES Y PULL REQUESTS
+# Los totales de abiertos y cerrados salen de los totalCount del lote GraphQL
+# (graphqlBatch), sin listar los elementos. El tiempo de resolución se
+# mantiene de forma incremental: por repositorio se guarda el tiempo de cada
+# elemento cerrado y una marca con el último updated_at visto, y en cada ciclo
+# sólo se piden los elementos actualizados desde entonces (since= en issues,
+# sort=updated descendente en pulls). Un elemento reabierto deja de contar.
+# Los issues de la API REST incluyen pull requests; aquí se descartan para que
+# coincidan con los totales de GraphQL.
+
+
+async def actualizar_resoluciones(repo, tipo):
+    clave = f"{tipo}:{repo['id_repositorio']}"
+    estado = cargar_estado_resoluciones(clave)
+    marca = estado.get("marca")
+    resoluciones = dict(estado.get("resoluciones", {}))
+    nueva_marca = marca
+    headers = {
+        "Authorization": f"token {config['TOKEN']}",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+    base = f"{config['GITHUB_API_URL']}/repos/{config['ORG']}/{repo['Repositorio']}/{tipo}?state=all&per_page=100"
+    if tipo == "issues":
+        base += "&sort=updated&direction=asc"
+        if marca:
+            base += f"&since={marca}"
+    else:
+        base += "&sort=updated&direction=desc"
+    page = 1
+    while True:
+        url = f"{base}&page={page}"
+        try:
+            response = await githubClient.get(url, headers=headers)
+        except githubClient.RequestException as e:
+            logging.error(f"Error en la solicitud para URL {url}: {e}")
+            return estado.get("resoluciones", {})
+        if response.status_code != 200:
+            logging.warning(
+                f"No se pudieron actualizar los {tipo} de {repo['Repositorio']}. Código: {response.status_code}"
+            )
+            return estado.get("resoluciones", {})
+        elementos = response.json()
+        fin = len(elementos) < 100
+        for elemento in elementos:
+            actualizado = elemento["updated_at"]
+            if tipo == "pulls" and marca and actualizado < marca:
+                fin = True
+                break
+            if nueva_marca is None or actualizado > nueva_marca:
+                nueva_marca = actualizado
+            if tipo == "issues" and "pull_request" in elemento:
+                continue
+            numero = str(elemento["number"])
+            if elemento["closed_at"] and elemento["created_at"]:
+                resoluciones[numero] = (
+                    parsear_fecha(elemento["closed_at"])
+                    - parsear_fecha(elemento["created_at"])
+                ).total_seconds()
+            else:
+                resoluciones.pop(numero, None)
+        if fin:
+            break
+        page += 1
+    guardar_estado_resoluciones(
+        clave, {"marca": nueva_marca, "resoluciones": resoluciones}
+    )
+    return resoluciones
+
+
+async def issues_agregado(repo):
+    conteo = (await obtener_conteos_repositorios()).get(repo["Repositorio"])
+    if conteo is None:
+        return None
+    resoluciones = await actualizar_resoluciones(repo, "issues")
+    total = conteo["issues_abiertas"] + conteo["issues_cerradas"]
+    segundos = sum(resoluciones.values())
+    tiempo_solucion = timedelta(seconds=segundos)
+    return {
+        "id_repositorio": repo["id_repositorio"],
+        "Repositorio": repo["Repositorio"],
+        "total_incidencias": total,
+        "incidencias_abiertas": conteo["issues_abiertas"],
+        "incidencias_cerradas": conteo["issues_cerradas"],
+        "tiempo_solucion_issues": str(tiempo_solucion),
+        "promedio_total_dias_resolucion": (
+            round(tiempo_solucion.days / total, 4) if total > 0 else 0
+        ),
+        "promedio_total_horas_resolucion": (
+            round(segundos / (total * 3600), 4) if total > 0 else 0
+        ),
+    }
+
+
+async def pulls_agregado(repo):
+    conteo = (await obtener_conteos_repositorios()).get(repo["Repositorio"])
+    if conteo is None:
+        return None
+    resoluciones = await actualizar_resoluciones(repo, "pulls")
+    cerrados = conteo["pulls_cerrados"]
+    tiempo_cierre = timedelta(seconds=sum(resoluciones.values()))
+    return {
+        "id_repositorio": repo["id_repositorio"],
+        "Repositorio": repo["Repositorio"],
+        "numero_pulls": conteo["pulls_abiertos"] + cerrados,
+        "numero_pulls_abiertos": conteo["pulls_abiertos"],
+        "numero_pulls_cerrados": cerrados,
+        "total_tiempo_cierre_pulls": str(tiempo_cierre),
+        "promedio_dias_cierre": (
+            round(tiempo_cierre.days / cerrados, 2) if cerrados > 0 else 0
+        ),
+    }
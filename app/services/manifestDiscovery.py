@@ -0,0 +1,102 @@
+from config import config
+from app.services import githubClient
+from app.services.graphqlBatch import ejecutar_consulta
+from app.services.concurrency import mapear_concurrente
+import logging
+import re
+
+# DESCUBRIMIENTO DE MANIFIESTOS
+# Se pide una sola vez el árbol recursivo de la rama (Git Trees API) y se
+# buscan todos los manifiestos de dependencias, también en subdirectorios
+# (monorepos). Los contenidos se descargan por lotes en una consulta GraphQL
+# con alias por blob, en lugar de una llamada a la API de contenidos por archivo.
+
+PATRON_MANIFIESTO = re.compile(
+    r"(^|/)(requirements[^/]*\.txt|package\.json|pom\.xml|gemfile|composer\.json)$",
+    re.IGNORECASE,
+)
+DIRECTORIOS_EXCLUIDOS = ("node_modules/", "vendor/")
+
+
+def es_manifiesto(ruta):
+    if any(
+        ruta.startswith(directorio) or f"/{directorio}" in ruta
+        for directorio in DIRECTORIOS_EXCLUIDOS
+    ):
+        return False
+    return bool(PATRON_MANIFIESTO.search(ruta))
+
+
+async def listar_manifiestos(repo, rama):
+    url = f"{config['GITHUB_API_URL']}/repos/{config['ORG']}/{repo}/git/trees/{rama}?recursive=1"
+    headers = {"Authorization": f"token {config['TOKEN']}"}
+    try:
+        response = await githubClient.get(url, headers=headers)
+        response.raise_for_status()
+    except githubClient.RequestException as e:
+        logging.warning(f"No se pudo obtener el árbol de {repo}@{rama}: {e}")
+        return None
+    arbol = response.json()
+    if arbol.get("truncated"):
+        logging.warning(f"Árbol de {repo}@{rama} truncado, la búsqueda será parcial")
+    return {
+        entrada["path"]: entrada["sha"]
+        for entrada in arbol.get("tree", [])
+        if entrada.get("type") == "blob" and es_manifiesto(entrada["path"])
+    }
+
+
+def construir_consulta_blobs(oids):
+    parametros = ["$owner: String!", "$name: String!"]
+    subconsultas = []
+    variables = {}
+    for i, oid in enumerate(oids):
+        parametros.append(f"$o{i}: GitObjectID!")
+        variables[f"o{i}"] = oid
+        subconsultas.append(
+            f"    b{i}: object(oid: $o{i}) {{ ... on Blob {{ text }} }}"
+        )
+    consulta = (
+        f"query({', '.join(parametros)}) {{\n"
+        f"  repository(owner: $owner, name: $name) {{\n"
+        + "\n".join(subconsultas)
+        + "\n  }\n}"
+    )
+    return consulta, variables
+
+
+async def descargar_blobs(repo, oids):
+    tamano = config["GRAPHQL_LOTE"]
+    lotes = [oids[i : i + tamano] for i in range(0, len(oids), tamano)]
+
+    async def descargar_lote(lote):
+        consulta, variables = construir_consulta_blobs(lote)
+        variables["owner"] = config["ORG"]
+        variables["name"] = repo
+        try:
+            data = await ejecutar_consulta(consulta, variables)
+        except githubClient.RequestException as e:
+            logging.error(f"Error al descargar manifiestos de {repo}: {e}")
+            return {}
+        repositorio = data.get("repository") or {}
+        return {
+            oid: (repositorio.get(f"b{i}") or {}).get("text")
+            for i, oid in enumerate(lote)
+        }
+
+    textos = {}
+    for resultado in await mapear_concurrente(descargar_lote, lotes):
+        textos.update(resultado)
+    return textos
+
+
+async def descubrir_manifiestos(repo, rama):
+    manifiestos = await listar_manifiestos(repo, rama)
+    if manifiestos is None:
+        return None
+    textos = await descargar_blobs(repo, list(set(manifiestos.values())))
+    return {
+        ruta: textos[oid]
+        for ruta, oid in manifiestos.items()
+        if textos.get(oid) is not None
+    }
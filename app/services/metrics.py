@@ -0,0 +1,77 @@
+from prometheus_client import Counter, Gauge, Histogram
+from config import config
+from yarl import URL
+
+# MÉTRICAS PROMETHEUS
+# Peticiones a GitHub y a los registros de paquetes (por plantilla de
+# endpoint), límite de tasa restante, indexación en Elasticsearch y duración
+# de cada etapa del ciclo de sincronización. Se exponen en /metrics.
+
+PETICIONES_HTTP = Counter(
+    "github_elk_peticiones_http_total",
+    "Peticiones HTTP salientes",
+    ["metodo", "endpoint", "estado"],
+)
+LATENCIA_HTTP = Histogram(
+    "github_elk_peticion_http_segundos",
+    "Latencia de las peticiones HTTP salientes",
+    ["metodo", "endpoint"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+LIMITE_RESTANTE = Gauge(
+    "github_elk_rate_limit_restantes",
+    "Consultas restantes a la API de GitHub según X-RateLimit-Remaining",
+    ["recurso"],
+)
+DOCUMENTOS_PRODUCIDOS = Counter(
+    "github_elk_documentos_producidos_total",
+    "Documentos generados para indexar",
+    ["indice"],
+)
+DOCUMENTOS_INDEXADOS = Counter(
+    "github_elk_documentos_indexados_total",
+    "Documentos indexados correctamente en Elasticsearch",
+    ["indice"],
+)
+ERRORES_INDEXACION = Counter(
+    "github_elk_errores_indexacion_total",
+    "Documentos rechazados o no enviados a Elasticsearch",
+    ["indice"],
+)
+LATENCIA_BULK = Histogram(
+    "github_elk_bulk_segundos",
+    "Duración de cada envío _bulk a Elasticsearch",
+    ["indice"],
+)
+DURACION_ETAPA = Gauge(
+    "github_elk_etapa_duracion_segundos",
+    "Duración de la última ejecución de cada etapa de sincronización",
+    ["etapa"],
+)
+EJECUCIONES_ETAPA = Counter(
+    "github_elk_etapa_ejecuciones_total",
+    "Ejecuciones de cada etapa de sincronización por resultado",
+    ["etapa", "estado"],
+)
+DURACION_CICLO = Gauge(
+    "github_elk_ciclo_duracion_segundos",
+    "Duración del último ciclo completo de tareas programadas",
+)
+
+
+def plantilla_endpoint(url):
+    base = config["GITHUB_API_URL"] or ""
+    if not base or not url.startswith(base):
+        return URL(url).host or url
+    partes = URL(url[len(base) :] or "/").path.strip("/").split("/")
+    if partes[0] == "repos" and len(partes) >= 3:
+        partes[1:3] = ["{owner}", "{repo}"]
+        if len(partes) > 4 and partes[3] == "contents":
+            partes[4:] = ["{path}"]
+        elif len(partes) > 5 and partes[3] == "git":
+            partes[5:] = ["{ref}"]
+        elif len(partes) > 4:
+            partes[4:] = ["{id}"]
+    elif partes[0] in ("orgs", "users") and len(partes) >= 2:
+        partes[1] = "{org}" if partes[0] == "orgs" else "{user}"
+    return "/" + "/".join(partes)
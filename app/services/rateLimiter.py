@@ -0,0 +1,109 @@
+from config import config
+import asyncio
+import logging
+import time
+
+# PLANIFICADOR DE CONSULTAS A GITHUB
+# Cubeta de tokens por recurso (core, graphql, search) alimentada con las
+# cabeceras X-RateLimit-* de cada respuesta. Reparte las consultas restantes
+# de forma uniforme hasta el siguiente reinicio y, si se agotan, espera
+# exactamente hasta X-RateLimit-Reset (o Retry-After).
+
+
+class CubetaTokens:
+    def __init__(self, recurso):
+        self.recurso = recurso
+        self.limite = None
+        self.restantes = None
+        self.reinicio = 0.0
+        self.tokens = float(config["RATE_LIMIT_RAFAGA"])
+        self.ultima_recarga = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def tasa(self, ahora):
+        if self.restantes is None:
+            return None
+        disponibles = max(self.restantes - config["RATE_LIMIT_RESERVA"], 0)
+        segundos = max(self.reinicio - ahora, 1.0)
+        return disponibles / segundos
+
+    def recargar(self, tasa):
+        ahora = time.monotonic()
+        self.tokens = min(
+            self.tokens + (ahora - self.ultima_recarga) * tasa,
+            float(config["RATE_LIMIT_RAFAGA"]),
+        )
+        self.ultima_recarga = ahora
+
+    async def adquirir(self):
+        async with self.lock:
+            while True:
+                ahora = time.time()
+                if self.restantes is not None and self.reinicio <= ahora:
+                    # Ventana nueva: se desconoce el presupuesto hasta la próxima respuesta
+                    self.restantes = None
+                tasa = self.tasa(ahora)
+                if tasa is None:
+                    return
+                if tasa == 0:
+                    espera = self.reinicio - ahora + 1
+                    logging.warning(
+                        f"Límite de la API de GitHub ({self.recurso}) agotado, esperando {round(espera)} s hasta el reinicio"
+                    )
+                    await asyncio.sleep(espera)
+                    continue
+                self.recargar(tasa)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.restantes -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / tasa)
+
+    def actualizar(self, headers, status_code):
+        restantes = headers.get("X-RateLimit-Remaining")
+        reinicio = headers.get("X-RateLimit-Reset")
+        if restantes is not None and reinicio is not None:
+            self.restantes = int(restantes)
+            self.reinicio = float(reinicio)
+            self.limite = int(headers.get("X-RateLimit-Limit", self.limite or 0))
+        if status_code not in (403, 429):
+            return None
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None:
+            return float(retry_after)
+        if self.restantes == 0:
+            return max(self.reinicio - time.time(), 0) + 1
+        return None
+
+
+_cubetas = {}
+
+
+def recurso_url(url):
+    ruta = url[len(config["GITHUB_API_URL"]) :]
+    if ruta.startswith("/graphql"):
+        return "graphql"
+    if ruta.startswith("/search"):
+        return "search"
+    return "core"
+
+
+def es_url_github(url):
+    return bool(config["GITHUB_API_URL"]) and url.startswith(config["GITHUB_API_URL"])
+
+
+def obtener_cubeta(recurso):
+    if recurso not in _cubetas:
+        _cubetas[recurso] = CubetaTokens(recurso)
+    return _cubetas[recurso]
+
+
+def estado_limites():
+    return {
+        recurso: {
+            "limite": cubeta.limite,
+            "restantes": cubeta.restantes,
+            "reinicio": cubeta.reinicio,
+        }
+        for recurso, cubeta in _cubetas.items()
+    }
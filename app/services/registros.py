@@ -0,0 +1,62 @@
+# REGISTROS COMPACTOS
+# Las respuestas de GitHub traen decenas de campos por elemento (autor,
+# committer, árbol, verificación, URLs...) de los que sólo se usan unos pocos.
+# Al leer cada página se proyectan a estas clases con __slots__, sin __dict__
+# por instancia, y el JSON completo se descarta en cuanto se procesa la página.
+
+
+class Repositorio:
+    __slots__ = ("id", "nombre", "creado", "rama_por_defecto", "branches_url")
+
+    def __init__(self, id, nombre, creado, rama_por_defecto, branches_url):
+        self.id = id
+        self.nombre = nombre
+        self.creado = creado
+        self.rama_por_defecto = rama_por_defecto
+        self.branches_url = branches_url
+
+    @classmethod
+    def desde_api(cls, repo):
+        return cls(
+            repo["id"],
+            repo["name"],
+            repo["created_at"],
+            repo["default_branch"],
+            repo["branches_url"],
+        )
+
+
+class Commit:
+    __slots__ = ("sha", "fecha", "login")
+
+    def __init__(self, sha, fecha, login):
+        self.sha = sha
+        self.fecha = fecha
+        self.login = login
+
+    @classmethod
+    def desde_api(cls, commit):
+        return cls(
+            commit["sha"],
+            commit["commit"]["committer"]["date"],
+            (commit.get("author") or {}).get("login"),
+        )
+
+
+class Colaborador:
+    __slots__ = ("id", "login", "contribuciones")
+
+    def __init__(self, id, login, contribuciones):
+        self.id = id
+        self.login = login
+        self.contribuciones = contribuciones
+
+    @classmethod
+    def desde_api(cls, colaborador):
+        return cls(
+            colaborador["id"], colaborador["login"], colaborador["contributions"]
+        )
+
+
+def proyectar(clase, elementos):
+    return [clase.desde_api(elemento) for elemento in elementos]
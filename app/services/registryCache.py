@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from config import config
+from app.services.dataStore import cargar_version_registro, guardar_version_registro
+from app.services.registryMirror import espejo_activo, version_espejo
+import asyncio
+import time
+
+# CACHÉ DE VERSIONES DE REGISTROS DE PAQUETES
+# La última versión de cada paquete se guarda por (ecosistema, paquete) con un
+# TTL, en memoria (LRU de REGISTRO_CACHE_MAX entradas) y en el almacén local,
+# de modo que cada paquete se consulta a lo sumo una vez por TTL para toda la
+# organización. Las consultas simultáneas del mismo paquete comparten una
+# única petición al registro, y cada registro admite como máximo
+# REGISTRO_MAX_CONCURRENTES peticiones a la vez. Con REGISTRO_ESPEJO se usa
+# en su lugar la instantánea local (ver registryMirror).
+# Los paquetes sin versión (no encontrados o con error del registro) también
+# se recuerdan, sólo en memoria y durante REGISTRO_TTL_FALLO, para no repetir
+# la consulta en cada repositorio que los declare.
+
+_cache = OrderedDict()
+_en_curso = {}
+_semaforos = {}
+_SIN_ENTRADA = object()
+
+
+def _guardar_en_memoria(clave, version, expira):
+    _cache[clave] = (version, expira)
+    _cache.move_to_end(clave)
+    while len(_cache) > config["REGISTRO_CACHE_MAX"]:
+        _cache.popitem(last=False)
+
+
+def version_en_cache(ecosistema, paquete):
+    clave = (ecosistema, paquete)
+    entrada = _cache.get(clave)
+    if entrada is None:
+        entrada = cargar_version_registro(ecosistema, paquete)
+        if entrada is None:
+            return _SIN_ENTRADA
+        _guardar_en_memoria(clave, *entrada)
+    version, expira = entrada
+    if expira <= time.time():
+        return _SIN_ENTRADA
+    _cache.move_to_end(clave)
+    return version
+
+
+def _semaforo_registro(ecosistema):
+    if ecosistema not in _semaforos:
+        _semaforos[ecosistema] = asyncio.Semaphore(config["REGISTRO_MAX_CONCURRENTES"])
+    return _semaforos[ecosistema]
+
+
+async def _resolver(ecosistema, paquete, consultar):
+    async with _semaforo_registro(ecosistema):
+        version = await consultar()
+    if version is None:
+        expira = time.time() + config["REGISTRO_TTL_FALLO"]
+        _guardar_en_memoria((ecosistema, paquete), None, expira)
+    else:
+        expira = time.time() + config["REGISTRO_TTL"]
+        _guardar_en_memoria((ecosistema, paquete), version, expira)
+        guardar_version_registro(ecosistema, paquete, version, expira)
+    return version
+
+
+async def version_registro(ecosistema, paquete, consultar):
+    if espejo_activo():
+        return version_espejo(ecosistema, paquete)
+    version = version_en_cache(ecosistema, paquete)
+    if version is not _SIN_ENTRADA:
+        return version
+    clave = (ecosistema, paquete)
+    tarea = _en_curso.get(clave)
+    if tarea is None:
+        tarea = asyncio.ensure_future(_resolver(ecosistema, paquete, consultar))
+        _en_curso[clave] = tarea
+        tarea.add_done_callback(lambda _: _en_curso.pop(clave, None))
+    return await asyncio.shield(tarea)
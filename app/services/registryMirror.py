@@ -0,0 +1,92 @@
+from config import config
+from app.services.dataStore import listar_versiones_registro, cerrar_conexion
+import argparse
+import logging
+import json
+import os
+
+# ESPEJO LOCAL DE REGISTROS DE PAQUETES
+# Si REGISTRO_ESPEJO apunta a un archivo o directorio, las últimas versiones
+# se resuelven desde esa instantánea, cargada en memoria al arrancar, y nunca
+# se consultan los registros públicos. Formatos admitidos:
+#   - archivo JSON: {"pypi": {"fastapi": "0.110.0", ...}, "npm": {...}, ...}
+#   - directorio con un JSON por ecosistema: pypi.json, npm.json,
+#     rubygems.json, maven.json, packagist.json ({"paquete": "versión"})
+# Los paquetes de Maven se identifican como "groupId:artifactId".
+#
+# La instantánea se genera desde la caché de versiones del almacén local de
+# una instancia con acceso a los registros:
+#
+#   python -m app.services.registryMirror --exportar espejo.json
+
+ECOSISTEMAS = ("pypi", "npm", "rubygems", "maven", "packagist")
+
+_espejo = None
+
+
+def espejo_activo():
+    return bool(config["REGISTRO_ESPEJO"])
+
+
+def _leer_json(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+def cargar_espejo(ruta=None):
+    global _espejo
+    ruta = ruta or config["REGISTRO_ESPEJO"]
+    if os.path.isdir(ruta):
+        espejo = {}
+        for ecosistema in ECOSISTEMAS:
+            archivo = os.path.join(ruta, f"{ecosistema}.json")
+            if os.path.exists(archivo):
+                espejo[ecosistema] = _leer_json(archivo)
+    else:
+        espejo = _leer_json(ruta)
+    _espejo = {
+        ecosistema: dict(espejo.get(ecosistema, {})) for ecosistema in ECOSISTEMAS
+    }
+    logging.info(
+        f"Espejo de registros cargado desde {ruta}: "
+        + ", ".join(f"{e}={len(p)}" for e, p in _espejo.items())
+    )
+    return _espejo
+
+
+def version_espejo(ecosistema, paquete):
+    if _espejo is None:
+        cargar_espejo()
+    return _espejo.get(ecosistema, {}).get(paquete)
+
+
+def exportar_espejo(ruta):
+    espejo = {ecosistema: {} for ecosistema in ECOSISTEMAS}
+    for ecosistema, paquete, version in listar_versiones_registro():
+        espejo.setdefault(ecosistema, {})[paquete] = version
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(espejo, archivo, indent=2, sort_keys=True)
+    return espejo
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--exportar",
+        metavar="RUTA",
+        required=True,
+        help="archivo JSON donde escribir las versiones guardadas en DB_ARCHIVO",
+    )
+    args = parser.parse_args()
+    try:
+        espejo = exportar_espejo(args.exportar)
+    finally:
+        cerrar_conexion()
+    print(
+        f"Espejo exportado a {args.exportar}: "
+        + ", ".join(f"{e}={len(p)}" for e, p in espejo.items())
+    )
+
+
+if __name__ == "__main__":
+    main()
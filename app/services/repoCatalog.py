@@ -0,0 +1,23 @@
+from config import data_lenguajes
+
+# CATÁLOGO DE REPOSITORIOS
+# Índice en memoria del lenguaje principal de cada repositorio por id, para
+# que el cruce de repositorios con data_lenguajes sea una búsqueda por clave
+# en lugar de un recorrido completo. Se reconstruye en O(n) cada vez que se
+# sustituyen las listas: al sincronizar repositorios o lenguajes, al cargar el
+# almacén local y al empezar cada ciclo.
+
+_lenguaje_principal = {}
+
+
+def actualizar_catalogo():
+    _lenguaje_principal.clear()
+    for datos_lenguaje in data_lenguajes:
+        lenguajes = datos_lenguaje["Lenguajes"]
+        _lenguaje_principal[datos_lenguaje["id_repositorio"]] = (
+            max(lenguajes, key=lenguajes.get) if lenguajes else None
+        )
+
+
+def lenguaje_principal(id_repositorio):
+    return _lenguaje_principal.get(id_repositorio)
@@ -0,0 +1,155 @@
+from config import config
+from app.services.dataStore import cargar_resultado, guardar_resultado
+from fastapi.responses import StreamingResponse
+from email.utils import formatdate
+import contextlib
+import functools
+import asyncio
+import json
+import time
+
+# RESULTADOS MATERIALIZADOS
+# Cada etapa de sincronización decorada con @materializado guarda su último
+# resultado (en memoria y en el almacén local). Las rutas GET sirven ese
+# resultado con metadatos de frescura (Last-Modified, Age, X-Cache) en lugar
+# de recalcularlo contra GitHub; ?refresh=true fuerza un nuevo cálculo.
+# Los cálculos simultáneos de la misma etapa comparten una única ejecución.
+# El refresh se ignora (se sirve lo materializado) si el resultado tiene menos
+# de REFRESH_MIN_SEGUNDOS o si hay un ciclo de sincronización en curso, que
+# vacía y rellena las listas compartidas mientras se ejecuta. Un refresh
+# aceptado vacía antes las cachés del ciclo de las que depende la etapa
+# (entradas: data_ramas, data_conteos, data_metricas_commits...), que si no
+# sólo se vacían al empezar el siguiente ciclo.
+#
+# STREAMING NDJSON
+# Con Accept: application/x-ndjson la respuesta se emite como un objeto JSON
+# por línea. El resultado materializado se serializa elemento a elemento y, si
+# no lo hay o se pide refresh, se emite en vivo según termina cada repositorio
+# sin acumular la lista completa (ese cálculo no sustituye al materializado).
+
+NDJSON = "application/x-ndjson"
+
+_resultados = {}
+_en_curso = {}
+_ciclo_en_curso = False
+
+
+def obtener_resultado(clave):
+    if clave not in _resultados:
+        entrada = cargar_resultado(clave)
+        if entrada is None:
+            return None
+        _resultados[clave] = entrada
+    return _resultados[clave]
+
+
+async def _materializar(clave, funcion):
+    datos = await funcion()
+    entrada = {"datos": datos, "actualizado": time.time()}
+    _resultados[clave] = entrada
+    guardar_resultado(clave, datos, entrada["actualizado"])
+    return datos
+
+
+@contextlib.contextmanager
+def ciclo_sincronizacion():
+    global _ciclo_en_curso
+    _ciclo_en_curso = True
+    try:
+        yield
+    finally:
+        _ciclo_en_curso = False
+
+
+def refresco_permitido(clave):
+    if _ciclo_en_curso:
+        return False
+    entrada = obtener_resultado(clave)
+    if entrada is None:
+        return True
+    return time.time() - entrada["actualizado"] >= config["REFRESH_MIN_SEGUNDOS"]
+
+
+def materializado(clave, entradas=()):
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        async def envoltura():
+            tarea = _en_curso.get(clave)
+            if tarea is None:
+                tarea = asyncio.ensure_future(_materializar(clave, funcion))
+                _en_curso[clave] = tarea
+                tarea.add_done_callback(lambda _: _en_curso.pop(clave, None))
+            return await asyncio.shield(tarea)
+
+        envoltura.clave = clave
+        envoltura.entradas = entradas
+        return envoltura
+
+    return decorador
+
+
+def _preparar_refresco(funcion):
+    # Con un cálculo de la etapa ya en vuelo se comparte, sin vaciar sus
+    # entradas a mitad de ejecución
+    if funcion.clave not in _en_curso:
+        for entrada in funcion.entradas:
+            entrada.clear()
+
+
+def cabeceras_frescura(entrada):
+    return {
+        "Last-Modified": formatdate(entrada["actualizado"], usegmt=True),
+        "Age": str(int(time.time() - entrada["actualizado"])),
+    }
+
+
+async def servir_materializado(funcion, response, refresh=False):
+    refresh = refresh and refresco_permitido(funcion.clave)
+    if refresh:
+        _preparar_refresco(funcion)
+    entrada = None if refresh else obtener_resultado(funcion.clave)
+    response.headers["X-Cache"] = "HIT" if entrada else "MISS"
+    if entrada is None:
+        await funcion()
+        entrada = obtener_resultado(funcion.clave)
+    response.headers.update(cabeceras_frescura(entrada))
+    return entrada["datos"]
+
+
+def acepta_ndjson(request):
+    return NDJSON in request.headers.get("accept", "")
+
+
+def linea_ndjson(elemento):
+    return json.dumps(elemento, ensure_ascii=False, default=str) + "\n"
+
+
+async def _emitir(primero, elementos):
+    yield linea_ndjson(primero)
+    async for elemento in elementos:
+        yield linea_ndjson(elemento)
+
+
+async def servir_ndjson(funcion, generador, refresh=False):
+    refresh = refresh and refresco_permitido(funcion.clave)
+    if refresh:
+        _preparar_refresco(funcion)
+    entrada = None if refresh else obtener_resultado(funcion.clave)
+    if entrada is not None:
+        return StreamingResponse(
+            (linea_ndjson(elemento) for elemento in entrada["datos"]),
+            media_type=NDJSON,
+            headers={"X-Cache": "HIT", **cabeceras_frescura(entrada)},
+        )
+    elementos = generador()
+    # Se espera al primer elemento antes de responder para que un error al
+    # arrancar (p. ej. sin repositorios) llegue como código de estado
+    try:
+        primero = await elementos.__anext__()
+    except StopAsyncIteration:
+        return StreamingResponse(
+            iter(()), media_type=NDJSON, headers={"X-Cache": "MISS"}
+        )
+    return StreamingResponse(
+        _emitir(primero, elementos), media_type=NDJSON, headers={"X-Cache": "MISS"}
+    )
@@ -0,0 +1,71 @@
+from config import config
+from app.services import metrics
+import logging
+import asyncio
+import time
+
+# PLANIFICADOR DE ETAPAS
+# Cada etapa declara de qué etapas depende. Las etapas independientes se
+# ejecutan a la vez (hasta MAX_ETAPAS_CONCURRENTES) y comparten el presupuesto
+# de la API de GitHub a través del cliente HTTP y del limitador de tasa.
+# Si una etapa falla, las que dependen de ella se omiten.
+
+ultima_ejecucion = {}
+
+
+def orden_topologico(etapas):
+    orden = []
+    estado = {}
+
+    def visitar(nombre, camino):
+        if estado.get(nombre) == "hecho":
+            return
+        if estado.get(nombre) == "visitando":
+            raise ValueError(f"Ciclo de dependencias: {' -> '.join(camino)}")
+        if nombre not in etapas:
+            raise ValueError(f"Etapa desconocida: {nombre}")
+        estado[nombre] = "visitando"
+        for dependencia in etapas[nombre][1]:
+            visitar(dependencia, camino + [dependencia])
+        estado[nombre] = "hecho"
+        orden.append(nombre)
+
+    for nombre in etapas:
+        visitar(nombre, [nombre])
+    return orden
+
+
+async def ejecutar_grafo(etapas):
+    semaforo = asyncio.Semaphore(config["MAX_ETAPAS_CONCURRENTES"])
+    tareas = {}
+    tiempos = {}
+
+    async def ejecutar(nombre):
+        funcion, dependencias = etapas[nombre]
+        resultados = await asyncio.gather(*(tareas[d] for d in dependencias))
+        if not all(resultados):
+            logging.warning(f"Etapa {nombre} omitida: falló una de sus dependencias")
+            tiempos[nombre] = {"estado": "omitida", "segundos": 0}
+            metrics.EJECUCIONES_ETAPA.labels(nombre, "omitida").inc()
+            return False
+        async with semaforo:
+            inicio = time.monotonic()
+            try:
+                await funcion()
+                estado = "ok"
+            except Exception as e:
+                logging.error(f"Error en la etapa {nombre}: {e}")
+                estado = "error"
+            segundos = round(time.monotonic() - inicio, 2)
+        tiempos[nombre] = {"estado": estado, "segundos": segundos}
+        metrics.DURACION_ETAPA.labels(nombre).set(segundos)
+        metrics.EJECUCIONES_ETAPA.labels(nombre, estado).inc()
+        logging.info(f"Etapa {nombre}: {estado} en {segundos} s")
+        return estado == "ok"
+
+    for nombre in orden_topologico(etapas):
+        tareas[nombre] = asyncio.ensure_future(ejecutar(nombre))
+    await asyncio.gather(*tareas.values())
+    ultima_ejecucion.clear()
+    ultima_ejecucion.update(tiempos)
+    return tiempos
@@ -0,0 +1,89 @@
+from datetime import datetime
+import argparse
+import json
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mockServer import DatosSinteticos, FORMATO_FECHA
+from app.services.decodificacion import decodificar_json, parsear_fecha, orjson
+from app.services.registros import Commit, proyectar
+
+# MICRO-BENCHMARK DE DECODIFICACIÓN
+# Coste de CPU por página de 100 elementos (commits e issues sintéticos del
+# servidor falso) de decodificar el JSON y leer sus fechas: json + strptime
+# (como antes) frente a la capa de app/services/decodificacion.py. La caché de
+# fechas se vacía en cada iteración para no medir sólo aciertos.
+#
+#   python -m benchmarks.decodeBenchmark --iteraciones 2000
+
+
+def pagina_commits(contenido):
+    return [
+        datetime.strptime(commit["commit"]["committer"]["date"], FORMATO_FECHA).hour
+        for commit in json.loads(contenido)
+    ]
+
+
+def pagina_commits_rapida(contenido):
+    parsear_fecha.cache_clear()
+    return [
+        parsear_fecha(commit.fecha).hour
+        for commit in proyectar(Commit, decodificar_json(contenido))
+    ]
+
+
+def pagina_issues(contenido):
+    return [
+        datetime.strptime(issue["closed_at"], FORMATO_FECHA)
+        - datetime.strptime(issue["created_at"], FORMATO_FECHA)
+        for issue in json.loads(contenido)
+        if issue["closed_at"] and issue["created_at"]
+    ]
+
+
+def pagina_issues_rapida(contenido):
+    parsear_fecha.cache_clear()
+    return [
+        parsear_fecha(issue["closed_at"]) - parsear_fecha(issue["created_at"])
+        for issue in decodificar_json(contenido)
+        if issue["closed_at"] and issue["created_at"]
+    ]
+
+
+def medir(funcion, contenido, iteraciones):
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        funcion(contenido)
+    return (time.perf_counter() - inicio) / iteraciones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iteraciones", type=int, default=2000)
+    args = parser.parse_args()
+
+    datos = DatosSinteticos("org", 1, 1, 100, 10, 100)
+    paginas = {
+        "commits": json.dumps(datos.repos[0]["commits"]).encode(),
+        "issues": json.dumps(datos.repos[0]["issues"]).encode(),
+    }
+    casos = {
+        "commits": (pagina_commits, pagina_commits_rapida),
+        "issues": (pagina_issues, pagina_issues_rapida),
+    }
+    print(f"decodificador JSON: {'orjson' if orjson else 'json'}")
+    print(f"{'página':<10} {'antes µs':>10} {'después µs':>11} {'mejora':>8}")
+    for nombre, (antes, despues) in casos.items():
+        assert antes(paginas[nombre]) == despues(paginas[nombre])
+        t_antes = medir(antes, paginas[nombre], args.iteraciones)
+        t_despues = medir(despues, paginas[nombre], args.iteraciones)
+        print(
+            f"{nombre:<10} {t_antes:>10.1f} {t_despues:>11.1f} {t_antes / t_despues:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+from aiohttp import web
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+
+# SERVIDOR FALSO DE GITHUB Y ELASTICSEARCH
+# Sirve las rutas REST y GraphQL que usa la aplicación con datos sintéticos
+# (número de repositorios, ramas, commits, colaboradores e issues
+# configurable), latencia artificial, cabeceras X-RateLimit-*, ETag/304 y
+# paginación con cabecera Link, además de los endpoints _bulk y _doc de
+# Elasticsearch. Cuenta las peticiones recibidas por tipo en /__conteo.
+#
+#   python -m benchmarks.mockServer --repos 50 --commits 2000 --latencia 0.05
+
+ARBOL = [
+    ("requirements.txt", "fastapi==0.100.0\nrequests==2.31.0\n"),
+    ("services/api/requirements-dev.txt", "pytest==7.0.0\n"),
+    (
+        "web/package.json",
+        '{"dependencies": {"react": "^17.0.0"}, "devDependencies": {"jest": "29.0.0"}}',
+    ),
+    ("web/node_modules/x/package.json", "{}"),
+    ("README.md", "# repo\n"),
+]
+BLOBS = {hashlib.sha1(texto.encode()).hexdigest(): texto for _, texto in ARBOL}
+
+# Últimas versiones publicadas para el espejo de registros del benchmark
+ESPEJO = {
+    "pypi": {"fastapi": "0.110.0", "requests": "2.31.0", "pytest": "8.0.0"},
+    "npm": {"react": "18.2.0", "jest": "29.0.0"},
+}
+
+FORMATO_FECHA = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class DatosSinteticos:
+    def __init__(self, org, repos, ramas, commits, colaboradores, issues, semilla=1):
+        rnd = random.Random(semilla)
+        self.org = org
+        self.usuarios = [f"user{i}" for i in range(colaboradores)]
+        self.repos = []
+        base = datetime.utcnow().replace(microsecond=0)
+        for r in range(repos):
+            lista_commits = []
+            for c in range(commits):
+                fecha = (base - timedelta(minutes=37 * c + r)).strftime(FORMATO_FECHA)
+                autor = self.usuarios[(c + r) % len(self.usuarios)]
+                lista_commits.append(
+                    {
+                        "sha": f"{r:04d}{c:036d}",
+                        "commit": {
+                            "author": {"name": autor, "date": fecha},
+                            "committer": {"name": autor, "date": fecha},
+                            "message": "m" * rnd.randint(10, 80),
+                        },
+                        "author": {
+                            "login": autor,
+                            "id": 1000 + self.usuarios.index(autor),
+                        },
+                        "parents": [{"sha": "p" * 40}],
+                    }
+                )
+            self.repos.append(
+                {
+                    "id": 5000 + r,
+                    "name": f"repo{r}",
+                    "created_at": "2023-05-01T10:00:00Z",
+                    "default_branch": "main",
+                    "ramas": ["main"] + [f"rama{b}" for b in range(ramas - 1)],
+                    "commits": lista_commits,
+                    "issues": [
+                        {
+                            "number": i,
+                            "state": "closed" if i % 2 else "open",
+                            "created_at": "2023-06-01T10:00:00Z",
+                            "updated_at": (
+                                datetime(2023, 6, 3, 10) + timedelta(seconds=i)
+                            ).strftime(FORMATO_FECHA),
+                            "closed_at": "2023-06-03T10:00:00Z" if i % 2 else None,
+                        }
+                        for i in range(issues)
+                    ],
+                }
+            )
+        self.por_nombre = {repo["name"]: repo for repo in self.repos}
+
+
+def paginar(request, elementos):
+    por_pagina = int(request.query.get("per_page", 30))
+    pagina = int(request.query.get("page", 1))
+    inicio = (pagina - 1) * por_pagina
+    ultima = max(1, -(-len(elementos) // por_pagina))
+    enlaces = []
+    if pagina < ultima:
+        enlaces.append(f'<{request.url.update_query(page=pagina + 1)}>; rel="next"')
+    enlaces.append(f'<{request.url.update_query(page=ultima)}>; rel="last"')
+    return elementos[inicio : inicio + por_pagina], {"Link": ", ".join(enlaces)}
+
+
+def crear_app(datos, latencia=0.0, limite_tasa=5000):
+    app = web.Application()
+    app["conteo"] = {}
+    app["restantes"] = {"core": limite_tasa, "graphql": limite_tasa}
+    reinicio = int(time.time()) + 3600
+
+    def contar(clave):
+        app["conteo"][clave] = app["conteo"].get(clave, 0) + 1
+
+    @web.middleware
+    async def intermediario(request, handler):
+        if request.path == "/__conteo":
+            return await handler(request)
+        es_github = request.path.startswith(("/repos", "/orgs", "/graphql"))
+        partes = request.path.split("/")
+        contar(partes[4] if request.path.startswith("/repos/") else request.path)
+        if latencia:
+            await asyncio.sleep(latencia)
+        respuesta = await handler(request)
+        if (
+            request.method == "GET"
+            and isinstance(respuesta, web.Response)
+            and respuesta.status == 200
+            and respuesta.body is not None
+        ):
+            etag = '"' + hashlib.md5(bytes(respuesta.body)).hexdigest() + '"'
+            if request.headers.get("If-None-Match") == etag:
+                contar("304")
+                respuesta = web.Response(status=304)
+            respuesta.headers["ETag"] = etag
+        if es_github:
+            recurso = "graphql" if request.path == "/graphql" else "core"
+            if respuesta.status != 304:
+                app["restantes"][recurso] = max(app["restantes"][recurso] - 1, 0)
+            respuesta.headers["X-RateLimit-Limit"] = str(limite_tasa)
+            respuesta.headers["X-RateLimit-Remaining"] = str(app["restantes"][recurso])
+            respuesta.headers["X-RateLimit-Reset"] = str(reinicio)
+            respuesta.headers["X-RateLimit-Resource"] = recurso
+        respuesta.headers["X-Elastic-Product"] = "Elasticsearch"
+        return respuesta
+
+    app.middlewares.append(intermediario)
+
+    async def repos_org(request):
+        url_base = f"{request.scheme}://{request.host}"
+        elementos = [
+            {
+                "id": repo["id"],
+                "name": repo["name"],
+                "created_at": repo["created_at"],
+                "default_branch": repo["default_branch"],
+                "branches_url": f"{url_base}/repos/{datos.org}/{repo['name']}/branches{{/branch}}",
+            }
+            for repo in datos.repos
+        ]
+        pagina, cabeceras = paginar(request, elementos)
+        return web.json_response(pagina, headers=cabeceras)
+
+    async def miembros(request):
+        elementos = [
+            {"id": 1000 + i, "login": usuario, "type": "User"}
+            for i, usuario in enumerate(datos.usuarios)
+        ]
+        pagina, cabeceras = paginar(request, elementos)
+        return web.json_response(pagina, headers=cabeceras)
+
+    async def lenguajes(request):
+        return web.json_response({"Python": 1000, "JavaScript": 200})
+
+    async def ramas(request):
+        repo = datos.por_nombre[request.match_info["repo"]]
+        pagina, cabeceras = paginar(request, [{"name": rama} for rama in repo["ramas"]])
+        return web.json_response(pagina, headers=cabeceras)
+
+    async def commits(request):
+        repo = datos.por_nombre[request.match_info["repo"]]
+        elementos = repo["commits"]
+        if "author" in request.query:
+            elementos = [
+                c for c in elementos if c["author"]["login"] == request.query["author"]
+            ]
+        if "since" in request.query:
+            desde = request.query["since"][:19]
+            elementos = [
+                c for c in elementos if c["commit"]["committer"]["date"][:19] >= desde
+            ]
+        pagina, cabeceras = paginar(request, elementos)
+        return web.json_response(pagina, headers=cabeceras)
+
+    async def issues(request):
+        repo = datos.por_nombre[request.match_info["repo"]]
+        elementos = repo["issues"]
+        estado = request.query.get("state", "open")
+        if estado != "all":
+            elementos = [issue for issue in elementos if issue["state"] == estado]
+        if "since" in request.query:
+            desde = request.query["since"][:19]
+            elementos = [issue for issue in elementos if issue["updated_at"] >= desde]
+        pagina, cabeceras = paginar(request, elementos)
+        return web.json_response(pagina, headers=cabeceras)
+
+    async def pulls(request):
+        repo = datos.por_nombre[request.match_info["repo"]]
+        elementos = repo["issues"]
+        if request.query.get("sort") == "updated":
+            elementos = sorted(
+                elementos,
+                key=lambda issue: issue["updated_at"],
+                reverse=request.query.get("direction") == "desc",
+            )
+        pagina, cabeceras = paginar(request, elementos)
+        return web.json_response(pagina, headers=cabeceras)
+
+    async def colaboradores(request):
+        repo = datos.por_nombre[request.match_info["repo"]]
+        cuenta = {}
+        for commit in repo["commits"]:
+            login = commit["author"]["login"]
+            cuenta[login] = cuenta.get(login, 0) + 1
+        elementos = [
+            {
+                "login": login,
+                "id": 1000 + datos.usuarios.index(login),
+                "contributions": n,
+            }
+            for login, n in cuenta.items()
+        ]
+        pagina, cabeceras = paginar(request, elementos)
+        return web.json_response(pagina, headers=cabeceras)
+
+    async def contenidos(request):
+        for ruta, texto in ARBOL:
+            if ruta == request.match_info["path"]:
+                return web.json_response(
+                    {"content": base64.b64encode(texto.encode()).decode()}
+                )
+        raise web.HTTPNotFound()
+
+    async def arbol(request):
+        elementos = [
+            {
+                "path": ruta,
+                "type": "blob",
+                "sha": hashlib.sha1(texto.encode()).hexdigest(),
+            }
+            for ruta, texto in ARBOL
+        ]
+        return web.json_response({"sha": "raiz", "tree": elementos, "truncated": False})
+
+    def nodos_ramas(repo, inicio, desde):
+        nodos = []
+        for b, nombre in enumerate(repo["ramas"][inicio : inicio + 100], start=inicio):
+            historial = repo["commits"][b:]
+            nodos.append(
+                {
+                    "name": nombre,
+                    "target": {
+                        "authoredDate": (
+                            historial[0]["commit"]["author"]["date"]
+                            if historial
+                            else "2020-01-01T00:00:00Z"
+                        ),
+                        "history": {"totalCount": len(historial)},
+                        "semana": {
+                            "totalCount": sum(
+                                1
+                                for c in historial
+                                if c["commit"]["author"]["date"][:19] >= desde
+                            )
+                        },
+                    },
+                }
+            )
+        return nodos
+
+    async def graphql(request):
+        cuerpo = await request.json()
+        variables = cuerpo.get("variables") or {}
+        data = {}
+        if "o0" in variables:
+            repositorio = {}
+            i = 0
+            while f"o{i}" in variables:
+                repositorio[f"b{i}"] = {"text": BLOBS.get(variables[f"o{i}"])}
+                i += 1
+            data["repository"] = repositorio
+        i = 0
+        while f"n{i}" in variables:
+            repo = datos.por_nombre.get(variables[f"n{i}"])
+            if repo is None:
+                data[f"r{i}"] = None
+            else:
+                inicio = int(variables.get(f"c{i}") or 0)
+                data[f"r{i}"] = {
+                    "refs": {
+                        "pageInfo": {
+                            "hasNextPage": inicio + 100 < len(repo["ramas"]),
+                            "endCursor": str(inicio + 100),
+                        },
+                        "nodes": nodos_ramas(
+                            repo, inicio, (variables.get("desde") or "")[:19]
+                        ),
+                    }
+                }
+            i += 1
+        i = 0
+        while f"q{i}" in variables:
+            repo = datos.por_nombre.get(variables[f"q{i}"])
+            if repo is None:
+                data[f"r{i}"] = None
+            else:
+                # Las pulls del servidor falso son los mismos elementos que los issues
+                abiertas = sum(
+                    1 for issue in repo["issues"] if issue["state"] == "open"
+                )
+                cerradas = len(repo["issues"]) - abiertas
+                data[f"r{i}"] = {
+                    "issuesAbiertas": {"totalCount": abiertas},
+                    "issuesCerradas": {"totalCount": cerradas},
+                    "pullsAbiertos": {"totalCount": abiertas},
+                    "pullsCerrados": {"totalCount": cerradas},
+                }
+            i += 1
+        return web.json_response({"data": data})
+
+    async def limite(request):
+        restantes = app["restantes"]["core"]
+        return web.json_response(
+            {
+                "rate": {
+                    "used": limite_tasa - restantes,
+                    "remaining": restantes,
+                    "limit": limite_tasa,
+                    "reset": reinicio,
+                }
+            }
+        )
+
+    async def es_raiz(request):
+        return web.json_response(
+            {"version": {"number": "8.12.0"}, "tagline": "You Know, for Search"}
+        )
+
+    async def es_bulk(request):
+        lineas = [linea for linea in (await request.read()).split(b"\n") if linea]
+        elementos = []
+        i = 0
+        while i < len(lineas):
+            accion = json.loads(lineas[i])
+            operacion = next(iter(accion))
+            elementos.append(
+                {
+                    operacion: {
+                        "_id": accion[operacion].get("_id"),
+                        "status": 200,
+                        "result": "updated",
+                    }
+                }
+            )
+            i += 1 if operacion == "delete" else 2
+        return web.json_response({"took": 1, "errors": False, "items": elementos})
+
+    async def es_doc(request):
+        if request.method == "GET":
+            return web.json_response({"found": False}, status=404)
+        return web.json_response({"result": "created"})
+
+    async def conteo(request):
+        return web.json_response(app["conteo"])
+
+    org = datos.org
+    app.router.add_get(f"/orgs/{org}/repos", repos_org)
+    app.router.add_get(f"/orgs/{org}/members", miembros)
+    app.router.add_get("/repos/{org}/{repo}/languages", lenguajes)
+    app.router.add_get("/repos/{org}/{repo}/branches", ramas)
+    app.router.add_get("/repos/{org}/{repo}/commits", commits)
+    app.router.add_get("/repos/{org}/{repo}/issues", issues)
+    app.router.add_get("/repos/{org}/{repo}/pulls", pulls)
+    app.router.add_get("/repos/{org}/{repo}/contributors", colaboradores)
+    app.router.add_get("/repos/{org}/{repo}/contents/{path:.*}", contenidos)
+    app.router.add_get("/repos/{org}/{repo}/git/trees/{ref}", arbol)
+    app.router.add_post("/graphql", graphql)
+    app.router.add_get("/rate_limit", limite)
+    app.router.add_get("/__conteo", conteo)
+    app.router.add_get("/", es_raiz)
+    app.router.add_route("*", "/_bulk", es_bulk)
+    app.router.add_route("*", "/{index}/_bulk", es_bulk)
+    app.router.add_route("*", "/{index}/_doc/{id}", es_doc)
+    app.router.add_route("*", "/{index}/_update/{id}", es_doc)
+    return app
+
+
+def argumentos(parser):
+    parser.add_argument("--org", default="org")
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--ramas", type=int, default=5)
+    parser.add_argument("--commits", type=int, default=500)
+    parser.add_argument("--colaboradores", type=int, default=10)
+    parser.add_argument("--issues", type=int, default=50)
+    parser.add_argument("--latencia", type=float, default=0.0)
+    parser.add_argument("--limite-tasa", type=int, default=5000)
+    return parser
+
+
+def crear_app_desde_argumentos(args):
+    datos = DatosSinteticos(
+        args.org, args.repos, args.ramas, args.commits, args.colaboradores, args.issues
+    )
+    return crear_app(datos, args.latencia, args.limite_tasa)
+
+
+if __name__ == "__main__":
+    parser = argumentos(argparse.ArgumentParser())
+    parser.add_argument("--puerto", type=int, default=8765)
+    args = parser.parse_args()
+    web.run_app(crear_app_desde_argumentos(args), port=args.puerto)
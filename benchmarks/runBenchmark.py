@@ -0,0 +1,137 @@
+from aiohttp import web
+from contextlib import redirect_stdout
+import aiohttp
+import argparse
+import asyncio
+import logging
+import tempfile
+import tracemalloc
+import json
+import io
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mockServer import ESPEJO, argumentos, crear_app_desde_argumentos
+
+# BENCHMARK DE EXTREMO A EXTREMO
+# Levanta el servidor falso de GitHub/Elasticsearch (o usa uno externo con
+# --url), ejecuta cada etapa de main.ETAPAS por separado en orden de
+# dependencias y después un ciclo completo de tareas_programadas (en caliente:
+# ETag, marcas de agua de commits y caché de versiones ya poblados). Por cada
+# etapa informa del tiempo, las peticiones recibidas por el servidor y el pico
+# de memoria (tracemalloc). Los registros de paquetes se resuelven siempre
+# desde un espejo local, por lo que los resultados son deterministas.
+#
+#   python -m benchmarks.runBenchmark --repos 50 --commits 2000 --latencia 0.02
+
+
+def configurar_entorno(url, directorio):
+    espejo = os.path.join(directorio, "espejo.json")
+    with open(espejo, "w", encoding="utf-8") as archivo:
+        json.dump(ESPEJO, archivo)
+    os.environ.update(
+        TOKEN="benchmark",
+        GITHUB_API_URL=url,
+        ORG=os.environ.get("ORG", "org"),
+        ELASTIC_SEARCH_URL=url,
+        ELASTICSEARCH_USERNAME="elastic",
+        ELASTIC_PASSWORD="elastic",
+        TASK_INTERVAL_MINUTES="60",
+        DATA_DIR=directorio,
+        REGISTRO_ESPEJO=espejo,
+        RATE_LIMIT_RESERVA="0",
+        # Sin ráfaga limitada: se mide la aplicación, no el ritmo del limitador
+        RATE_LIMIT_RAFAGA=os.environ.get("RATE_LIMIT_RAFAGA", "1000000"),
+    )
+
+
+async def leer_conteo(sesion, url):
+    async with sesion.get(f"{url}/__conteo") as respuesta:
+        conteo = await respuesta.json()
+    return sum(conteo.values()) - conteo.get("304", 0), conteo
+
+
+async def medir(nombre, funcion, sesion, url):
+    peticiones_antes, _ = await leer_conteo(sesion, url)
+    tracemalloc.reset_peak()
+    memoria_antes = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    estado = "ok"
+    try:
+        # main imprime las listas de datos en cada ciclo
+        with redirect_stdout(io.StringIO()):
+            await funcion()
+    except Exception as e:
+        estado = f"error: {e}"
+    segundos = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] - memoria_antes
+    peticiones_despues, _ = await leer_conteo(sesion, url)
+    return {
+        "etapa": nombre,
+        "segundos": round(segundos, 3),
+        "peticiones": peticiones_despues - peticiones_antes,
+        "pico_mb": round(pico / 1024 / 1024, 2),
+        "estado": estado,
+    }
+
+
+def imprimir(resultados):
+    print(f"{'etapa':<20} {'segundos':>10} {'peticiones':>11} {'pico MB':>9}  estado")
+    for resultado in resultados:
+        print(
+            f"{resultado['etapa']:<20} {resultado['segundos']:>10.3f} "
+            f"{resultado['peticiones']:>11} {resultado['pico_mb']:>9.2f}  {resultado['estado']}"
+        )
+
+
+async def ejecutar(args):
+    runner = None
+    url = args.url
+    if not url:
+        runner = web.AppRunner(crear_app_desde_argumentos(args))
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", args.puerto).start()
+        url = f"http://127.0.0.1:{args.puerto}"
+    directorio = tempfile.mkdtemp(prefix="github-elk-bench-")
+    configurar_entorno(url, directorio)
+
+    import main
+    from app.services import githubClient
+    from app.services.elasticClient import cerrar_es
+    from app.services.dataStore import cerrar_conexion
+    from app.services.taskGraph import orden_topologico
+
+    logging.getLogger().setLevel(logging.WARNING)
+    resultados = []
+    tracemalloc.start()
+    async with aiohttp.ClientSession() as sesion:
+        for nombre in orden_topologico(main.ETAPAS):
+            resultados.append(await medir(nombre, main.ETAPAS[nombre][0], sesion, url))
+        resultados.append(
+            await medir("ciclo_completo", main.tareas_programadas, sesion, url)
+        )
+        _, conteo = await leer_conteo(sesion, url)
+    tracemalloc.stop()
+
+    await githubClient.cerrar_sesion()
+    await cerrar_es()
+    cerrar_conexion()
+    if runner:
+        await runner.cleanup()
+
+    imprimir(resultados)
+    print(f"peticiones por tipo: {json.dumps(conteo, sort_keys=True)}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump({"etapas": resultados, "conteo": conteo}, archivo, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argumentos(argparse.ArgumentParser())
+    parser.add_argument("--puerto", type=int, default=8766)
+    parser.add_argument("--url", help="servidor falso ya en ejecución")
+    parser.add_argument("--json", help="archivo donde guardar los resultados")
+    asyncio.run(ejecutar(parser.parse_args()))
@@ -1,21 +1,55 @@
-from dotenv import load_dotenv
-import os
- 
-load_dotenv()
- 
-
-config = {
-    "TOKEN": os.getenv("TOKEN"),
-    "GITHUB_API_URL": os.getenv("GITHUB_API_URL"),
-    "ORG": os.getenv("ORG"),
-    "ELASTIC_SEARCH_URL": os.getenv("ELASTIC_SEARCH_URL")
-}
-
-issues_repo_consultados = set()
-commits_repo_consultados = set()
-
-data_repositorios = []
-data_lenguajes = []
-data_usuarios = []
-data_usuarios_activos = []
-data_commits = []
\ No newline at end of file
+from dotenv import load_dotenv
+import os
+ 
+load_dotenv()
+ 
+
+config = {
+    "TOKEN": os.getenv("TOKEN"),
+    "GITHUB_API_URL": os.getenv("GITHUB_API_URL"),
+    "ORG": os.getenv("ORG"),
+    "ELASTIC_SEARCH_URL": os.getenv("ELASTIC_SEARCH_URL"),
+    "ELASTICSEARCH_USERNAME": os.getenv("ELASTICSEARCH_USERNAME"),
+    "ELASTIC_PASSWORD": os.getenv("ELASTIC_PASSWORD"),
+    "HTTP_MAX_CONEXIONES": int(os.getenv("HTTP_MAX_CONEXIONES", "50")),
+    "HTTP_KEEPALIVE": int(os.getenv("HTTP_KEEPALIVE", "60")),
+    "HTTP_TIMEOUT": int(os.getenv("HTTP_TIMEOUT", "60")),
+    "HTTP_MAX_POR_HOST": int(os.getenv("HTTP_MAX_POR_HOST", "20")),
+    "HTTP_CACHE_MAX": int(os.getenv("HTTP_CACHE_MAX", "20000")),
+    "HTTP_CACHE_BYTES": int(os.getenv("HTTP_CACHE_BYTES", str(64 * 1024 * 1024))),
+    "MAX_TAREAS_CONCURRENTES": int(os.getenv("MAX_TAREAS_CONCURRENTES", "10")),
+    "MAX_ETAPAS_CONCURRENTES": int(os.getenv("MAX_ETAPAS_CONCURRENTES", "4")),
+    "RATE_LIMIT_RAFAGA": int(os.getenv("RATE_LIMIT_RAFAGA", "200")),
+    "RATE_LIMIT_RESERVA": int(os.getenv("RATE_LIMIT_RESERVA", "100")),
+    "RATE_LIMIT_REINTENTOS": int(os.getenv("RATE_LIMIT_REINTENTOS", "3")),
+    "DATA_DIR": os.getenv("DATA_DIR", "data"),
+    "ES_BULK_TAMANO": int(os.getenv("ES_BULK_TAMANO", "500")),
+    "ES_BULK_BYTES": int(os.getenv("ES_BULK_BYTES", str(5 * 1024 * 1024))),
+    "ES_BULK_INTERVALO": float(os.getenv("ES_BULK_INTERVALO", "5")),
+    "GRAPHQL_LOTE": int(os.getenv("GRAPHQL_LOTE", "20")),
+    # graphql (totalCount del lote de ramas), link (per_page=1) o completo
+    "CONTEO_COMMITS": os.getenv("CONTEO_COMMITS", "graphql"),
+    # agregado (totalCount por GraphQL + tiempos incrementales) o completo
+    "MODO_ISSUES_PULLS": os.getenv("MODO_ISSUES_PULLS", "agregado"),
+    # Antigüedad mínima de un resultado materializado para aceptar ?refresh=true
+    "REFRESH_MIN_SEGUNDOS": int(os.getenv("REFRESH_MIN_SEGUNDOS", "300")),
+    "REGISTRO_TTL": int(os.getenv("REGISTRO_TTL", str(24 * 3600))),
+    "REGISTRO_TTL_FALLO": int(os.getenv("REGISTRO_TTL_FALLO", str(3600))),
+    "REGISTRO_CACHE_MAX": int(os.getenv("REGISTRO_CACHE_MAX", "10000")),
+    "REGISTRO_MAX_CONCURRENTES": int(os.getenv("REGISTRO_MAX_CONCURRENTES", "8")),
+    "REGISTRO_ESPEJO": os.getenv("REGISTRO_ESPEJO", ""),
+    "DB_ARCHIVO": os.getenv(
+        "DB_ARCHIVO", os.path.join(os.getenv("DATA_DIR", "data"), "github.db")
+    ),
+}
+
+issues_repo_consultados = set()
+commits_repo_consultados = set()
+
+data_repositorios = []
+data_lenguajes = []
+data_usuarios = []
+data_usuarios_activos = []
+data_metricas_commits = {}
+data_ramas = {}
+data_conteos = {}
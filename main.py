@@ -1,137 +1,161 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import commits, user, repository
-from app.api.routes.user import repetir_tareas_usuario
-from app.api.routes.commits import repetir_tareas_commits
-from app.api.routes.repository import (
-    repetir_tareas_repositorio_v1,
-    repetir_tareas_repositorio_v2,
-)
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-from dotenv import load_dotenv
-from datetime import datetime
-from config import (
-    config,
-    data_commits,
-    data_repositorios,
-    data_lenguajes,
-    data_usuarios,
-    data_usuarios_activos,
-)
-import requests
-import logging
-import asyncio
-import os
-
-
-app = FastAPI(title="github-elk", version="1.0.0", contact={"name": "github-elk"})
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
-origins = [
-    "*",
-]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Exposición de rutas para pruebas
-# app.include_router(repository.router, prefix="/api")
-# app.include_router(commits.router, prefix="/api")
-# app.include_router(user.router, prefix="/api")
-
-
-async def tasa_ApiGithub():
-    url = f"{config['GITHUB_API_URL']}/rate_limit"
-    headers = {"Authorization": f"token {config['TOKEN']}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        limit = response.json()
-        used = limit["rate"]["used"]
-        remaining = limit["rate"]["remaining"]
-        if remaining > 0:
-            logging.info(
-                f"Te quedan {remaining} consultas disponibles en la API de GitHub, USOS: {used}"
-            )
-        else:
-            logging.warning(
-                "Has alcanzado el límite máximo de consultas a la API de GitHub. Por favor, espera un rato antes de hacer más consultas."
-            )
-    else:
-        logging.error(
-            f"Hubo un error al hacer la consulta a la API de GitHub. Código de estado: {response.status_code}"
-        )
-
-
-async def tareas_programadas():
-    global data_commits, data_repositorios, data_lenguajes, data_usuarios, data_usuarios_activos
-    logging.info(f"Tarea ejecutada a las {datetime.now()}")
-
-    print("Este es el array de commits", data_commits)
-    print("Este es el array de repositorios", data_repositorios)
-    print("Este es el array de lenguajes", data_lenguajes)
-    print("Este es el array de usuarios", data_usuarios)
-    print("Este es el array de usuarios activos", data_usuarios_activos)
-
-    # MÓDULO REPOSITORIOS v1
-
-    await tasa_ApiGithub()
-    await repetir_tareas_repositorio_v1()
-    await tasa_ApiGithub()
-    await asyncio.sleep(4200)
-
-    # MÓDULO REPOSITORIOS v2
-
-    await tasa_ApiGithub()
-    await repetir_tareas_repositorio_v2()
-    await tasa_ApiGithub()
-    await asyncio.sleep(4200)
-
-    # MÓDULO USUARIOS
-
-    await tasa_ApiGithub()
-    await repetir_tareas_usuario()
-    await tasa_ApiGithub()
-    await asyncio.sleep(4200)
-
-    # MÓDULO COMMITS
-
-    await tasa_ApiGithub()
-    await repetir_tareas_commits()
-    await tasa_ApiGithub()
-
-    data_commits.clear()
-    data_repositorios.clear()
-    data_lenguajes.clear()
-    data_usuarios.clear()
-    data_usuarios_activos.clear()
-
-    print("Este es el array de commits", data_commits)
-    print("Este es el array de repositorios", data_repositorios)
-    print("Este es el array de lenguajes", data_lenguajes)
-    print("Este es el array de usuarios", data_usuarios)
-    print("Este es el array de usuarios activos", data_usuarios_activos)
-
-    logging.info(f"Tareas terminadas a las {datetime.now()}")
-
-
-@app.on_event("startup")
-async def startup_event():
-    logging.info(f"FastApi en ejecución: {datetime.now()}")
-    load_dotenv()
-    scheduler = AsyncIOScheduler(timezone="America/Bogota")
-    task_interval = int(os.getenv("TASK_INTERVAL_MINUTES"))
-    scheduler.add_job(
-        tareas_programadas,
-        IntervalTrigger(minutes=task_interval),
-        id="tareas_programadas",
-    )
-    scheduler.start()
-    await tareas_programadas()
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from app.api.routes import commits, user, repository, metrics
+from app.services import githubClient
+from app.services.elasticClient import cerrar_es
+from app.services.dataStore import cargar_datos, guardar_datos, cerrar_conexion
+from app.services.taskGraph import ejecutar_grafo
+from app.services.metrics import DURACION_CICLO
+from app.services.registryMirror import espejo_activo, cargar_espejo
+from app.services.repoCatalog import actualizar_catalogo
+from app.services.resultCache import ciclo_sincronizacion
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from dotenv import load_dotenv
+from datetime import datetime
+from config import (
+    config,
+    data_repositorios,
+    data_lenguajes,
+    data_usuarios,
+    data_usuarios_activos,
+    data_metricas_commits,
+    data_ramas,
+    data_conteos,
+)
+import logging
+import time
+import os
+
+
+app = FastAPI(title="github-elk", version="1.0.0", contact={"name": "github-elk"})
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+origins = [
+    "*",
+]
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+app.include_router(metrics.router)
+
+# Las rutas de lectura sirven el último resultado materializado por el ciclo
+# de sincronización (?refresh=true para recalcular), no consultan GitHub
+app.include_router(repository.router, prefix="/api")
+app.include_router(commits.router, prefix="/api")
+app.include_router(user.router, prefix="/api")
+
+
+async def tasa_ApiGithub():
+    url = f"{config['GITHUB_API_URL']}/rate_limit"
+    headers = {"Authorization": f"token {config['TOKEN']}"}
+    response = await githubClient.get(url, headers=headers)
+    if response.status_code == 200:
+        limit = response.json()
+        used = limit["rate"]["used"]
+        remaining = limit["rate"]["remaining"]
+        if remaining > 0:
+            logging.info(
+                f"Te quedan {remaining} consultas disponibles en la API de GitHub, USOS: {used}"
+            )
+        else:
+            logging.warning(
+                "Has alcanzado el límite máximo de consultas a la API de GitHub. Por favor, espera un rato antes de hacer más consultas."
+            )
+    else:
+        logging.error(
+            f"Hubo un error al hacer la consulta a la API de GitHub. Código de estado: {response.status_code}"
+        )
+
+
+# Etapa -> (función, etapas de las que depende)
+ETAPAS = {
+    # MÓDULO REPOSITORIOS
+    "repositorios_org": (repository.repositorios_org, []),
+    "lenguajes": (repository.lenguajes_repositorio, ["repositorios_org"]),
+    "dependencias": (repository.dependencias_desactualizadas, ["lenguajes"]),
+    "inactivos": (repository.inactivos, ["repositorios_org"]),
+    "issues": (repository.Issues_repositorio, ["repositorios_org"]),
+    "total_commits": (repository.total_commits_repositorio, ["repositorios_org"]),
+    "ramas": (repository.ramas_repositorio, ["repositorios_org"]),
+    "actividad": (repository.mas_actividad, ["repositorios_org"]),
+    "pulls": (repository.pulls_repositorio, ["repositorios_org"]),
+    # MÓDULO USUARIOS
+    "miembros": (user.miembros_grupoASD, []),
+    "miembros_activos": (user.miembros_activos, ["repositorios_org"]),
+    # MÓDULO COMMITS
+    "commits_usuarios": (commits.contador_commits_usuariosRepo, ["miembros_activos"]),
+    "commits_por_dia": (commits.obtener_media_commits_por_dia, ["repositorios_org"]),
+    "commits_por_hora": (commits.obtener_media_commits_por_hora, ["repositorios_org"]),
+}
+
+
+async def tareas_programadas():
+    global data_repositorios, data_lenguajes, data_usuarios, data_usuarios_activos
+    logging.info(f"Tarea ejecutada a las {datetime.now()}")
+
+    print("Este es el array de repositorios", data_repositorios)
+    print("Este es el array de lenguajes", data_lenguajes)
+    print("Este es el array de usuarios", data_usuarios)
+    print("Este es el array de usuarios activos", data_usuarios_activos)
+
+    with ciclo_sincronizacion():
+        data_repositorios.clear()
+        data_lenguajes.clear()
+        data_usuarios.clear()
+        data_usuarios_activos.clear()
+        data_metricas_commits.clear()
+        data_ramas.clear()
+        data_conteos.clear()
+        actualizar_catalogo()
+
+        inicio = time.monotonic()
+        await tasa_ApiGithub()
+        tiempos = await ejecutar_grafo(ETAPAS)
+        await tasa_ApiGithub()
+        DURACION_CICLO.set(time.monotonic() - inicio)
+
+        guardar_datos()
+
+    print("Este es el array de repositorios", data_repositorios)
+    print("Este es el array de lenguajes", data_lenguajes)
+    print("Este es el array de usuarios", data_usuarios)
+    print("Este es el array de usuarios activos", data_usuarios_activos)
+
+    logging.info(
+        f"Tareas terminadas a las {datetime.now()}, tiempos por etapa: {tiempos}"
+    )
+
+
+@app.on_event("startup")
+async def startup_event():
+    logging.info(f"FastApi en ejecución: {datetime.now()}")
+    load_dotenv()
+    cargar_datos()
+    if espejo_activo():
+        cargar_espejo()
+    scheduler = AsyncIOScheduler(timezone="America/Bogota")
+    task_interval = int(os.getenv("TASK_INTERVAL_MINUTES"))
+    scheduler.add_job(
+        tareas_programadas,
+        IntervalTrigger(minutes=task_interval),
+        id="tareas_programadas",
+    )
+    scheduler.start()
+    await tareas_programadas()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await githubClient.cerrar_sesion()
+    await cerrar_es()
+    cerrar_conexion()
+    logging.info(f"FastApi detenido: {datetime.now()}")
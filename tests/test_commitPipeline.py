@@ -0,0 +1,76 @@
+from urllib.parse import parse_qs, urlparse
+import asyncio
+
+from config import config
+from app.services import commitPipeline, dataStore, githubClient
+from app.services.commitAnalytics import invalidar_epocas
+
+REPO = {"id_repositorio": 1, "Repositorio": "repo", "rama por defecto": "main"}
+TOTAL_COMMITS = 250
+
+
+class RespuestaFalsa:
+    def __init__(self, status_code, datos=None):
+        self.status_code = status_code
+        self.datos = datos
+
+    def json(self):
+        return self.datos
+
+
+def commits_sinteticos(total):
+    # Más recientes primero, como la API de GitHub
+    return [
+        {
+            "sha": f"sha{i:04d}",
+            "commit": {
+                "committer": {"date": f"2024-01-{1 + i // 24:02d}T{i % 24:02d}:00:00Z"}
+            },
+            "author": {"login": f"autor{i % 3}"},
+        }
+        for i in reversed(range(total))
+    ]
+
+
+def github_falso(commits, paginas_fallidas):
+    async def get(url, headers=None, **kwargs):
+        consulta = parse_qs(urlparse(url).query)
+        pagina = int(consulta["page"][0])
+        if pagina in paginas_fallidas:
+            return RespuestaFalsa(502)
+        elementos = commits
+        if "since" in consulta:
+            elementos = [
+                c
+                for c in commits
+                if c["commit"]["committer"]["date"] >= consulta["since"][0]
+            ]
+        por_pagina = int(consulta["per_page"][0])
+        return RespuestaFalsa(
+            200, elementos[(pagina - 1) * por_pagina : pagina * por_pagina]
+        )
+
+    return get
+
+
+def test_pagina_fallida_no_avanza_la_marca(tmp_path, monkeypatch):
+    monkeypatch.setitem(config, "DB_ARCHIVO", str(tmp_path / "datos.db"))
+    dataStore.cerrar_conexion()
+    invalidar_epocas(REPO["id_repositorio"])
+    commits = commits_sinteticos(TOTAL_COMMITS)
+    clave = f"{REPO['id_repositorio']}:{REPO['rama por defecto']}"
+    try:
+        # Ciclo 1: la página 2 devuelve 502 tras una primera página correcta
+        monkeypatch.setattr(githubClient, "get", github_falso(commits, {2}))
+        asyncio.run(commitPipeline.ingerir(REPO))
+        assert dataStore.cargar_estado_commits(clave) == {}
+
+        # Ciclo 2: GitHub responde bien y se recupera el historial completo
+        monkeypatch.setattr(githubClient, "get", github_falso(commits, set()))
+        metricas = asyncio.run(commitPipeline.ingerir(REPO))
+        assert metricas["total"] == TOTAL_COMMITS
+        assert sum(metricas["por_autor"].values()) == TOTAL_COMMITS
+        assert dataStore.cargar_estado_commits(clave)["marca"]["sha"] == "sha0249"
+    finally:
+        dataStore.cerrar_conexion()
+        invalidar_epocas(REPO["id_repositorio"])
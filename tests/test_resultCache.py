@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+import asyncio
+
+from aiohttp import web
+from fastapi import Response
+
+from benchmarks.mockServer import DatosSinteticos, FORMATO_FECHA, crear_app
+from config import config, data_repositorios, data_ramas, data_metricas_commits
+from app.api.routes import commits, repository
+from app.services import dataStore, githubClient, resultCache
+from app.services.commitAnalytics import invalidar_epocas
+from app.services.elasticClient import cerrar_es
+
+COMMITS_INICIALES = 150
+COMMITS_NUEVOS = 50
+
+
+def agregar_commits(repo, cantidad):
+    # Commits más recientes que los existentes, al principio del historial
+    base = datetime.utcnow().replace(microsecond=0) + timedelta(minutes=1)
+    nuevos = [
+        {
+            "sha": f"nuevo{c:035d}",
+            "commit": {
+                "author": {"name": "user0", "date": fecha},
+                "committer": {"name": "user0", "date": fecha},
+                "message": "m",
+            },
+            "author": {"login": "user0", "id": 1000},
+            "parents": [{"sha": "p" * 40}],
+        }
+        for c, fecha in (
+            (c, (base + timedelta(minutes=c)).strftime(FORMATO_FECHA))
+            for c in reversed(range(cantidad))
+        )
+    ]
+    repo["commits"][:0] = nuevos
+
+
+async def servir(funcion, refresh=False):
+    response = Response()
+    datos = await resultCache.servir_materializado(funcion, response, refresh)
+    return datos, response.headers["X-Cache"]
+
+
+async def comprobar_refresco():
+    datos = DatosSinteticos("org", 1, 1, COMMITS_INICIALES, 3, 0)
+    runner = web.AppRunner(crear_app(datos))
+    await runner.setup()
+    sitio = web.TCPSite(runner, "127.0.0.1", 0)
+    await sitio.start()
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+    config.update(GITHUB_API_URL=url, ELASTIC_SEARCH_URL=url)
+    try:
+        await repository.repositorios_org()
+        totales, _ = await servir(repository.total_commits_repositorio)
+        por_dia, _ = await servir(commits.obtener_media_commits_por_dia)
+        assert totales[0]["commits_repo"] == COMMITS_INICIALES
+        assert por_dia[0]["commits_ultimos_7_dias"] == COMMITS_INICIALES
+
+        agregar_commits(datos.repos[0], COMMITS_NUEVOS)
+
+        # Sin refresh se sirve lo materializado
+        totales, cache = await servir(repository.total_commits_repositorio)
+        assert cache == "HIT" and totales[0]["commits_repo"] == COMMITS_INICIALES
+
+        totales, cache = await servir(repository.total_commits_repositorio, True)
+        por_dia, _ = await servir(commits.obtener_media_commits_por_dia, True)
+        total = COMMITS_INICIALES + COMMITS_NUEVOS
+        assert cache == "MISS"
+        assert totales[0]["commits_repo"] == total
+        assert por_dia[0]["commits_ultimos_7_dias"] == total
+    finally:
+        await githubClient.cerrar_sesion()
+        await cerrar_es()
+        await runner.cleanup()
+
+
+def test_refresh_recoge_datos_nuevos(tmp_path, monkeypatch):
+    for clave, valor in {
+        "TOKEN": "prueba",
+        "ORG": "org",
+        "ELASTICSEARCH_USERNAME": "elastic",
+        "ELASTIC_PASSWORD": "elastic",
+        "DB_ARCHIVO": str(tmp_path / "datos.db"),
+        "REFRESH_MIN_SEGUNDOS": 0,
+        "RATE_LIMIT_RESERVA": 0,
+        "GITHUB_API_URL": None,
+        "ELASTIC_SEARCH_URL": None,
+    }.items():
+        monkeypatch.setitem(config, clave, valor)
+    dataStore.cerrar_conexion()
+    try:
+        asyncio.run(comprobar_refresco())
+    finally:
+        dataStore.cerrar_conexion()
+        for repo in data_repositorios:
+            invalidar_epocas(repo["id_repositorio"])
+        data_repositorios.clear()
+        data_ramas.clear()
+        data_metricas_commits.clear()
+        resultCache._resultados.clear()